@@ -3,6 +3,8 @@ import re
 import json
 from groq import Groq
 from config import Config
+from deadline import DeadlineExceeded, deadline_timeout
+from error_handler import PostProcessingError
 
 
 class AIAnalyzer:
@@ -21,7 +23,7 @@ class AIAnalyzer:
             "from": r"\bfrom\s+([A-Za-z\s]{2,15})(?:\s|,|\.|\b)",
         }
 
-    def is_complaint(self, text):
+    def is_complaint(self, text, deadline=None):
         """Simple semantic complaint detection"""
         if not text or len(text.strip()) < 5:
             return False
@@ -37,6 +39,9 @@ class AIAnalyzer:
             if re.search(pattern, text, re.IGNORECASE):
                 return False
 
+        if deadline:
+            deadline.require("complaint classification")
+
         print(f"   🤖 AI complaint analysis...")
 
         prompt = f"""
@@ -63,6 +68,7 @@ Answer only "true" or "false":
                 ],
                 temperature=0.3,
                 max_tokens=5,
+                timeout=deadline_timeout(deadline, Config.GROQ_TIMEOUT),
             )
 
             response = completion.choices[0].message.content.strip().lower()
@@ -70,12 +76,19 @@ Answer only "true" or "false":
             print(f"   🎯 AI decision: {response}")
             return result
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
+            # A timeout or API failure is not a "no": leave the post unclassified
             print(f"   ❌ AI error: {e}")
-            return False
+            raise PostProcessingError(
+                f"Complaint classification failed: {e}", stage="classification"
+            ) from e
 
-    def analyze_complaint_with_location(self, complaint_text):
+    def analyze_complaint_with_location(self, complaint_text, deadline=None):
         """Enhanced complaint analysis with semantic location detection"""
+        if deadline:
+            deadline.require("complaint analysis")
 
         prompt = f"""
 Analyze this complaint and extract information including location details:
@@ -131,6 +144,7 @@ Respond with JSON:
                 ],
                 temperature=0.3,
                 max_tokens=800,
+                timeout=deadline_timeout(deadline, Config.GROQ_TIMEOUT),
             )
 
             content = completion.choices[0].message.content.strip()
@@ -145,6 +159,8 @@ Respond with JSON:
                     return self._enhance_location_data(result, complaint_text)
                 raise
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"   ❌ Analysis error: {e}")
             return None
@@ -0,0 +1,256 @@
+# backfill.py - Chunked, resumable, parallel reprocessing of historical posts
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from config import Config
+from facebook_api import FacebookAPIError
+from mongo_client import run_once
+from rate_limiter import RateLimiter
+from main import FacebookMentionsAnalyzer
+
+
+class HistoricalBackfill:
+    def __init__(self, start_date, end_date, chunk="month", parallelism=None, job_id=None):
+        if chunk not in ("month", "week"):
+            raise ValueError("chunk must be 'month' or 'week'")
+
+        self.start_date = start_date
+        self.end_date = end_date
+        self.chunk = chunk
+        self.parallelism = parallelism or Config.BACKFILL_PARALLELISM
+        self.job_id = job_id or (
+            f"{start_date:%Y%m%d}-{end_date:%Y%m%d}-{chunk}"
+        )
+
+        # Separate, smaller request budget so the live scheduler is not starved.
+        # Budgets are per process and not coordinated with the scheduler's, so
+        # BACKFILL_MAX_REQUESTS_PER_HOUR must leave room for the live runs.
+        rate_limiter = RateLimiter(
+            Config.BACKFILL_MAX_REQUESTS_PER_HOUR,
+            Config.BACKFILL_FACEBOOK_DELAY,
+            Config.BACKFILL_GROQ_DELAY,
+        )
+        self.analyzer = FacebookMentionsAnalyzer(rate_limiter=rate_limiter)
+        self.mongodb_service = self.analyzer.mongodb_service
+        self.progress_collection = self.mongodb_service.db["backfill_progress"]
+        run_once(
+            "backfill_progress",
+            lambda: self.progress_collection.create_index("job_id", background=True),
+        )
+
+        self._durations = []
+        self._lock = threading.Lock()
+
+    def build_chunks(self):
+        """Split [start_date, end_date) into calendar month or week windows"""
+        chunks = []
+        cursor = self.start_date
+        while cursor < self.end_date:
+            if self.chunk == "month":
+                boundary = (cursor.replace(day=1) + timedelta(days=32)).replace(day=1)
+            else:
+                boundary = cursor - timedelta(days=cursor.weekday()) + timedelta(days=7)
+            boundary = datetime.combine(boundary.date(), datetime.min.time())
+            chunk_end = min(boundary, self.end_date)
+            chunks.append((cursor, chunk_end))
+            cursor = chunk_end
+        return chunks
+
+    def _chunk_id(self, chunk_start):
+        return f"{self.job_id}:{chunk_start:%Y-%m-%d}"
+
+    def _pending_chunks(self, chunks):
+        """Chunks not yet completed by a previous invocation of this job"""
+        done = {
+            doc["_id"]
+            for doc in self.progress_collection.find(
+                {"job_id": self.job_id, "status": "done"}, {"_id": 1}
+            )
+        }
+        return [chunk for chunk in chunks if self._chunk_id(chunk[0]) not in done]
+
+    def _update_progress(self, chunk_start, chunk_end, **fields):
+        self.progress_collection.update_one(
+            {"_id": self._chunk_id(chunk_start)},
+            {
+                "$set": {**fields, "updated_at": datetime.now()},
+                "$setOnInsert": {
+                    "job_id": self.job_id,
+                    "chunk_start": chunk_start,
+                    "chunk_end": chunk_end,
+                },
+            },
+            upsert=True,
+        )
+
+    def _flush(self, batch):
+        """Persist a small batch of processed posts and clear it"""
+        if not batch:
+            return 0
+        saved, updated = self.mongodb_service.save_complaints_only(batch)
+        batch.clear()
+        return saved + updated
+
+    def process_chunk(self, chunk_start, chunk_end):
+        """Stream one window page by page, persisting in small batches"""
+        started = time.time()
+        counters = {"posts_seen": 0, "complaints": 0, "failed": 0, "persisted": 0}
+        self._update_progress(chunk_start, chunk_end, status="running", **counters)
+
+        batch = []
+        # Strict paging: a failed page must fail the chunk, never end it early
+        # and get it marked "done" with posts missing
+        pages = self.analyzer.facebook_api.iter_tagged_mentions(
+            int(chunk_start.timestamp()),
+            int(chunk_end.timestamp()),
+            raise_on_error=True,
+        )
+        for page in pages:
+            for post in page:
+                counters["posts_seen"] += 1
+                try:
+                    processed = self.analyzer.process_post(post)
+                except Exception as e:
+                    counters["failed"] += 1
+                    self.analyzer.dead_letter_queue.record_failure(post, e)
+                    continue
+
+                if processed and processed["complaint"]["is_complaint"]:
+                    counters["complaints"] += 1
+                    batch.append(processed)
+                    if len(batch) >= Config.BACKFILL_SAVE_BATCH_SIZE:
+                        counters["persisted"] += self._flush(batch)
+
+            # Page boundary: make partial progress visible
+            self._update_progress(chunk_start, chunk_end, status="running", **counters)
+
+        counters["persisted"] += self._flush(batch)
+        duration = time.time() - started
+        self._update_progress(
+            chunk_start,
+            chunk_end,
+            status="done",
+            duration_seconds=round(duration, 1),
+            finished_at=datetime.now(),
+            **counters,
+        )
+        return counters, duration
+
+    def _process_chunk_with_retry(self, chunk_start, chunk_end):
+        """Retry a chunk whose Facebook fetch failed, backing off each time.
+
+        Reprocessing is safe: complaints are upserted by facebook_post_id.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self.process_chunk(chunk_start, chunk_end)
+            except FacebookAPIError as e:
+                attempt += 1
+                if attempt > Config.BACKFILL_CHUNK_RETRIES:
+                    raise
+                delay = Config.BACKFILL_RETRY_DELAY * 2 ** (attempt - 1)
+                print(
+                    f"⚠️  Chunk {chunk_start:%Y-%m-%d} fetch failed ({e}), "
+                    f"retry {attempt}/{Config.BACKFILL_CHUNK_RETRIES} in {delay}s"
+                )
+                self._update_progress(
+                    chunk_start, chunk_end, status="retrying", attempts=attempt, error=str(e)
+                )
+                time.sleep(delay)
+
+    def _eta_seconds(self, remaining):
+        """Average completed-chunk duration spread over the worker pool"""
+        if not self._durations:
+            return None
+        average = sum(self._durations) / len(self._durations)
+        return average * remaining / self.parallelism
+
+    def run(self):
+        chunks = self.build_chunks()
+        pending = self._pending_chunks(chunks)
+
+        print(f"🗂️  BACKFILL JOB {self.job_id}")
+        print(f"📅 {self.start_date:%A, %B %d, %Y} → {self.end_date:%A, %B %d, %Y}")
+        print(
+            f"🧩 {len(chunks)} {self.chunk} chunks, {len(chunks) - len(pending)} already done"
+        )
+        print(f"⚙️  Parallelism: {self.parallelism}")
+
+        if not pending:
+            print("✅ Nothing to backfill")
+            return
+
+        completed = 0
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            futures = {
+                executor.submit(self._process_chunk_with_retry, start, end): (
+                    start,
+                    end,
+                )
+                for start, end in pending
+            }
+            for future in as_completed(futures):
+                start, end = futures[future]
+                try:
+                    counters, duration = future.result()
+                except Exception as e:
+                    print(f"❌ Chunk {start:%Y-%m-%d} failed: {e}")
+                    self._update_progress(start, end, status="failed", error=str(e))
+                    continue
+
+                with self._lock:
+                    self._durations.append(duration)
+                    completed += 1
+                    remaining = len(pending) - completed
+                    eta = self._eta_seconds(remaining)
+
+                eta_text = f"{eta / 60:.1f} min" if eta is not None else "unknown"
+                print(
+                    f"✅ Chunk {start:%Y-%m-%d} done in {duration:.0f}s - "
+                    f"{counters['posts_seen']} posts, {counters['complaints']} complaints "
+                    f"| {completed}/{len(pending)} | ETA {eta_text}"
+                )
+
+        print(f"🏁 Backfill {self.job_id} finished")
+
+    def status(self):
+        """Print stored per-chunk progress for this job"""
+        for doc in self.progress_collection.find({"job_id": self.job_id}).sort(
+            "chunk_start", 1
+        ):
+            print(
+                f"   {doc['chunk_start']:%Y-%m-%d} → {doc['chunk_end']:%Y-%m-%d}: "
+                f"{doc.get('status')} ({doc.get('posts_seen', 0)} posts, "
+                f"{doc.get('complaints', 0)} complaints)"
+            )
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reprocess historical tagged posts")
+    parser.add_argument("--since", type=_parse_date, required=True, help="YYYY-MM-DD")
+    parser.add_argument(
+        "--until",
+        type=_parse_date,
+        default=datetime.combine(datetime.now().date(), datetime.min.time()),
+        help="YYYY-MM-DD (exclusive, default today)",
+    )
+    parser.add_argument("--chunk", choices=["month", "week"], default="month")
+    parser.add_argument("--parallel", type=int, default=None)
+    parser.add_argument("--job-id", default=None)
+    parser.add_argument("--status", action="store_true", help="Show progress only")
+    args = parser.parse_args()
+
+    backfill = HistoricalBackfill(
+        args.since, args.until, args.chunk, args.parallel, args.job_id
+    )
+    if args.status:
+        backfill.status()
+    else:
+        backfill.run()
@@ -0,0 +1,167 @@
+# benchmarks.py - Offline benchmarks for dashboard response formatting and encoding
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from response_compression import SUPPORTED_ENCODINGS, compress, iter_compressed
+from complaint_formatter import COMPLAINT_PROFILES, compute_display
+from dashboard_server import ComprehensiveDashboardApp
+
+DEPARTMENTS = ["Roads", "Water Supply", "Electricity", "Sanitation", "IT Department"]
+LOCATIONS = ["Ward 5", "Main Bazaar", "Bus Stand", "Civil Lines", None]
+
+
+def synthetic_complaints(count, seed=42):
+    """Stored-complaint documents shaped like _map_to_complaint_schema output"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    complaints = []
+    for index in range(count):
+        location = rng.choice(LOCATIONS)
+        complaints.append(
+            {
+                "_id": ObjectId(),
+                "facebook_post_id": f"1234567890_{index}",
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+                "profile_name": f"Citizen {index}",
+                "complaint_query": "Streetlight not working near the market for "
+                f"{rng.randint(2, 20)} days, please fix it soon #{index}",
+                "priority_score": rng.randint(1, 5),
+                "department": rng.choice(DEPARTMENTS),
+                "recommended_officer": "Executive Engineer",
+                "status": rng.choice(["pending_review", "in_progress", "resolved"]),
+                "ai_analysis": {
+                    "sentiment": "negative",
+                    "urgency_level": rng.choice(["high", "medium", "low"]),
+                    "category": "infrastructure",
+                    "summary": "Citizen reports a broken streetlight near the market.",
+                    "suggested_actions": ["Inspect site", "Replace bulb"],
+                },
+                "location_data": (
+                    {"location": location, "type": "area", "confidence": 0.8,
+                     "method": "semantic"}
+                    if location
+                    else None
+                ),
+                "facebook_permalink": f"https://facebook.com/posts/{index}",
+                "image_link": "",
+                "video_link": "",
+            }
+        )
+        complaints[-1]["display"] = compute_display(complaints[-1])
+    return complaints
+
+
+def _timed(function, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def bench_compression(count, repeat=3):
+    """Serialize count formatted complaints and compress with each encoding"""
+    app = ComprehensiveDashboardApp.__new__(ComprehensiveDashboardApp)
+    formatted, format_seconds = _timed(
+        lambda: [
+            app._format_government_complaint(complaint)
+            for complaint in synthetic_complaints(count)
+        ],
+        repeat,
+    )
+    body, serialize_seconds = _timed(
+        lambda: json.dumps(formatted, default=str).encode(), repeat
+    )
+
+    print(f"\n📦 {count} complaints: {len(body) / 1024:.0f} KiB identity")
+    print(f"   format {format_seconds * 1000:.1f} ms | json {serialize_seconds * 1000:.1f} ms")
+
+    results = {"complaints": count, "identity_bytes": len(body), "encodings": {}}
+    for encoding in SUPPORTED_ENCODINGS:
+        compressed, seconds = _timed(lambda: compress(body, encoding), repeat)
+        streamed, stream_seconds = _timed(
+            lambda: b"".join(iter_compressed(body, encoding)), repeat
+        )
+        ratio = len(body) / len(compressed)
+        results["encodings"][encoding] = {
+            "bytes": len(compressed),
+            "ratio": round(ratio, 1),
+            "ms": round(seconds * 1000, 2),
+            "stream_bytes": len(streamed),
+            "stream_ms": round(stream_seconds * 1000, 2),
+        }
+        print(
+            f"   {encoding:<5} {len(compressed) / 1024:8.0f} KiB  x{ratio:5.1f}  "
+            f"{seconds * 1000:7.1f} ms  (streamed {stream_seconds * 1000:.1f} ms)"
+        )
+    return results
+
+
+def bench_profiles(count, repeat=3):
+    """Format and serialize count complaints with each response profile.
+
+    "stored" documents carry the precomputed display subdocument; "legacy"
+    ones (not yet migrated) have every display field computed per request.
+    """
+    app = ComprehensiveDashboardApp.__new__(ComprehensiveDashboardApp)
+    stored = synthetic_complaints(count)
+    legacy = [
+        {field: value for field, value in complaint.items() if field != "display"}
+        for complaint in stored
+    ]
+
+    print(f"\n🧾 {count} complaints by profile:")
+    results = {"complaints": count, "profiles": {}}
+    for profile, fields in COMPLAINT_PROFILES.items():
+        for documents, label in ((stored, "stored"), (legacy, "legacy")):
+            formatted, format_seconds = _timed(
+                lambda: [
+                    app._format_government_complaint(complaint, fields)
+                    for complaint in documents
+                ],
+                repeat,
+            )
+            body, serialize_seconds = _timed(
+                lambda: json.dumps(formatted, default=str).encode(), repeat
+            )
+            results["profiles"][f"{profile}_{label}"] = {
+                "fields": len(fields),
+                "bytes": len(body),
+                "format_ms": round(format_seconds * 1000, 2),
+                "json_ms": round(serialize_seconds * 1000, 2),
+            }
+            print(
+                f"   {profile:<8} {label:<7} {len(fields):3d} fields  "
+                f"{len(body) / 1024:8.0f} KiB  format {format_seconds * 1000:7.1f} ms  "
+                f"json {serialize_seconds * 1000:7.1f} ms"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard response benchmarks")
+    parser.add_argument(
+        "--complaints",
+        default="100,1000,5000",
+        help="Comma-separated list sizes to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    print("⏱️  RESPONSE FORMATTING & COMPRESSION BENCHMARK")
+    all_results = [
+        {
+            **bench_compression(int(count), args.repeat),
+            **bench_profiles(int(count), args.repeat),
+        }
+        for count in args.complaints.split(",")
+    ]
+    if args.json:
+        print(json.dumps(all_results, indent=2))
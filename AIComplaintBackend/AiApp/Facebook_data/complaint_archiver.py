@@ -0,0 +1,121 @@
+# complaint_archiver.py - Moves closed complaints out of the hot collection
+import time
+from datetime import datetime, timedelta, timezone
+from pymongo import DeleteOne, ReplaceOne
+from config import Config
+
+
+class ComplaintArchiver:
+    """Move resolved/rejected complaints older than ARCHIVE_AFTER_DAYS into
+    complaints_archive, keeping the hot collection (and its indexes) down to
+    the items officers are still working on.
+
+    Each batch is copied with idempotent upserts before it is deleted from
+    the hot collection, so an interrupted run never loses a complaint. A
+    hot complaint is only deleted if it is still the version that was
+    copied (same change_seq); one changed in between is re-copied, or has
+    its archive copy dropped if it is no longer eligible. The stats rollup
+    is all-time and is not touched by a move.
+    """
+
+    def __init__(self, mongodb_service):
+        self.mongodb_service = mongodb_service
+
+    def _candidate_query(self, older_than_days):
+        # status_updated_at is written as local time, created_at as UTC
+        closed_before = datetime.now() - timedelta(days=older_than_days)
+        created_before = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        return {
+            "status": {"$in": Config.ARCHIVE_STATUSES},
+            "$or": [
+                {"status_updated_at": {"$lt": closed_before}},
+                {
+                    "status_updated_at": {"$exists": False},
+                    "created_at": {"$lt": created_before},
+                },
+            ],
+        }
+
+    def _move_batch(self, batch, query, attempts=3):
+        hot = self.mongodb_service.complaints_collection
+        archive = self.mongodb_service.archive_collection
+        archived_at = datetime.now(timezone.utc)
+        # The move is a change: delta-sync clients see it as a removal
+        with self.mongodb_service.reserving_change_seq(len(batch)) as first_seq:
+            archive.bulk_write(
+                [
+                    ReplaceOne(
+                        {"_id": complaint["_id"]},
+                        {
+                            **complaint,
+                            "archived_at": archived_at,
+                            "change_seq": first_seq + offset,
+                        },
+                        upsert=True,
+                    )
+                    for offset, complaint in enumerate(batch)
+                ],
+                ordered=False,
+            )
+
+        # Every write bumps change_seq, so this only deletes the copied version
+        ids = [complaint["_id"] for complaint in batch]
+        deleted = hot.bulk_write(
+            [
+                DeleteOne(
+                    {"_id": complaint["_id"], "change_seq": complaint.get("change_seq")}
+                )
+                for complaint in batch
+            ],
+            ordered=False,
+        ).deleted_count
+
+        changed = set()
+        retry = []
+        if deleted < len(ids):
+            # Changed between copy and delete: the hot copy stays authoritative
+            changed = {doc["_id"] for doc in hot.find({"_id": {"$in": ids}}, {"_id": 1})}
+            if attempts > 1:
+                retry = list(hot.find({"$and": [query, {"_id": {"$in": list(changed)}}]}))
+            retried = {complaint["_id"] for complaint in retry}
+            archive.delete_many({"_id": {"$in": list(changed - retried)}})
+        if deleted:
+            self.mongodb_service.bump_generation()
+            # Live dashboards drop archived complaints; counters are all-time
+            self.mongodb_service.event_log.publish(
+                ("removed", complaint["facebook_post_id"], {"reason": "archived"})
+                for complaint in batch
+                if complaint["_id"] not in changed
+            )
+        if retry:
+            # Still eligible: copy the current version over the stale one
+            deleted += self._move_batch(retry, query, attempts - 1)
+        return deleted
+
+    def archive(self, older_than_days=None, batch_size=None, pause_seconds=0.1):
+        """Move every eligible complaint in batches; returns the number moved"""
+        older_than_days = older_than_days or Config.ARCHIVE_AFTER_DAYS
+        batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+        query = self._candidate_query(older_than_days)
+        hot = self.mongodb_service.complaints_collection
+        moved = 0
+
+        while True:
+            batch = list(hot.find(query).limit(batch_size))
+            if not batch:
+                break
+
+            moved += self._move_batch(batch, query)
+            if len(batch) < batch_size:
+                break
+            time.sleep(pause_seconds)
+
+        if moved:
+            print(f"🗄️  Archived {moved} closed complaints older than {older_than_days} days")
+        return moved
+
+
+if __name__ == "__main__":
+    from mongodb_data_service import MongoDBComplaintService
+
+    ComplaintArchiver(MongoDBComplaintService()).archive()
@@ -0,0 +1,148 @@
+# complaint_events.py - Capped-collection event log behind /api/stream
+import time
+from datetime import datetime, timezone
+from pymongo import CursorType
+from config import Config
+from mongo_client import reserve_sequence, run_once
+
+
+class ComplaintEventLog:
+    """Append-only log of complaint changes in a capped collection.
+
+    Every event gets a sequence number (_id) from a counter in the meta
+    collection, so readers can resume after the last id they saw (follow()
+    delivers ids in order even when writers insert out of order). The log
+    is shared by every process that writes complaints (scheduler, backfill,
+    dashboard workers) and is tailed by the dashboard's SSE clients. Old
+    events fall off the end once the collection reaches its size limit;
+    has_gap() tells a reader that it has to reload instead of resuming.
+    """
+
+    def __init__(self, db, collection_name="complaint_events"):
+        self.db = db
+        self.collection_name = collection_name
+        self.collection = db[collection_name]
+
+    def ensure_collection(self):
+        if self.collection_name not in self.db.list_collection_names():
+            self.db.create_collection(
+                self.collection_name,
+                capped=True,
+                size=Config.EVENT_LOG_MAX_BYTES,
+                max=Config.EVENT_LOG_MAX_EVENTS,
+            )
+            print(f"📄 Capped collection '{self.collection_name}' created")
+
+    def publish(self, events):
+        """Append (type, facebook_post_id, data) tuples; never raises"""
+        events = list(events)
+        if not events:
+            return
+        try:
+            # Never let an insert create the log as a plain, unbounded collection
+            run_once(self.collection_name, self.ensure_collection)
+            first = reserve_sequence(self.db, "complaint_events_seq", len(events))
+            now = datetime.now(timezone.utc)
+            self.collection.insert_many(
+                [
+                    {
+                        "_id": first + offset,
+                        "type": event_type,
+                        "facebook_post_id": facebook_post_id,
+                        "data": data,
+                        "at": now,
+                    }
+                    for offset, (event_type, facebook_post_id, data) in enumerate(events)
+                ]
+            )
+        except Exception as e:
+            print(f"⚠️  Could not publish {len(events)} complaint events: {e}")
+
+    def latest_seq(self):
+        counter = self.db["meta"].find_one({"_id": "complaint_events_seq"})
+        return counter["value"] if counter else 0
+
+    def has_gap(self, after_seq):
+        """True if events after after_seq have already been dropped"""
+        oldest = self.collection.find_one({}, {"_id": 1}, sort=[("$natural", 1)])
+        if oldest is None:
+            return after_seq < self.latest_seq()
+        return after_seq < oldest["_id"] - 1
+
+    def follow(self, after_seq, idle_seconds, gap_wait_seconds=None):
+        """Yield events after after_seq in _id order as they are written, forever.
+
+        Uses a tailable cursor that waits up to idle_seconds for new
+        events; None is yielded whenever that wait ends with nothing to
+        send so callers can send a heartbeat. A dead cursor (empty log, or
+        the reader fell behind the capped end) is simply reopened.
+
+        Ids are reserved before the insert, so with several writers an
+        event can land in the log (whose tail order is insert order) after
+        one with a higher id. Events are held back until every lower id
+        has arrived, so the ids a reader has seen always form a prefix and
+        resuming after the last one loses nothing.
+        """
+        if gap_wait_seconds is None:
+            gap_wait_seconds = Config.EVENT_LOG_GAP_WAIT_SECONDS
+        in_order = _InOrder(after_seq, gap_wait_seconds)
+
+        while True:
+            cursor = self.collection.find(
+                {"_id": {"$gte": in_order.next_seq}},
+                cursor_type=CursorType.TAILABLE_AWAIT,
+                max_await_time_ms=int(idle_seconds * 1000),
+            )
+            try:
+                while cursor.alive:
+                    for event in cursor:
+                        in_order.add(event)
+                        yield from in_order.ready()
+                    # The wait ended: also releases events held past a gap
+                    # that has timed out
+                    ready = in_order.ready()
+                    if ready:
+                        yield from ready
+                    else:
+                        yield None
+            finally:
+                cursor.close()
+
+            time.sleep(idle_seconds)
+
+
+class _InOrder:
+    """Releases events in consecutive _id order.
+
+    An id still missing after gap_wait_seconds is given up on (its publish
+    failed, or it already fell off the capped log) and the events held
+    behind it are released.
+    """
+
+    def __init__(self, after_seq, gap_wait_seconds):
+        self.next_seq = after_seq + 1
+        self.gap_wait_seconds = gap_wait_seconds
+        self.held = {}
+        self.gap_started = None
+
+    def add(self, event):
+        if event["_id"] >= self.next_seq:
+            self.held[event["_id"]] = event
+
+    def ready(self):
+        """Events that can be sent now, in _id order"""
+        released = []
+        while self.held:
+            if self.next_seq in self.held:
+                released.append(self.held.pop(self.next_seq))
+                self.next_seq += 1
+                self.gap_started = None
+            elif self.gap_started is None:
+                self.gap_started = time.monotonic()
+                break
+            elif time.monotonic() - self.gap_started >= self.gap_wait_seconds:
+                self.next_seq = min(self.held)
+                self.gap_started = None
+            else:
+                break
+        return released
@@ -0,0 +1,361 @@
+# complaint_formatter.py - Government view of stored complaints, by field group
+from datetime import datetime
+from functools import lru_cache
+
+# Numeric weight of ai_analysis.urgency_level in the triage order
+URGENCY_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+
+DISPLAY_FORMAT = "%A, %B %d, %Y at %I:%M %p IST"
+DATE_FORMAT = "%A, %B %d, %Y"
+TIME_FORMAT = "%I:%M %p IST"
+
+STATUS_DISPLAY = {
+    "pending_review": "Pending Review",
+    "in_progress": "In Progress",
+    "resolved": "Resolved",
+    "rejected": "Rejected",
+}
+
+# Output fields that copy one document field: name -> (field, default)
+COPIED_FIELDS = {
+    "name": ("profile_name", "Unknown"),
+    "profile_name": ("profile_name", "Unknown"),
+    "description": ("complaint_query", "No description"),
+    "complaint_query": ("complaint_query", "No description"),
+    "original_message": ("original_message", ""),
+    "processing_time": ("processing_timestamp", ""),
+    "last_updated": ("last_updated", ""),
+    "priority_score": ("priority_score", 1),
+    "department": ("department", "Not assigned"),
+    "recommended_officer": ("recommended_officer", "To be assigned"),
+    "status": ("status", "pending_review"),
+    "facebook_link": ("facebook_permalink", ""),
+    "image_link": ("image_link", ""),
+    "video_link": ("video_link", ""),
+}
+
+# Output fields that copy one ai_analysis field: name -> default
+ANALYSIS_FIELDS = {
+    "urgency_level": "low",
+    "sentiment": "neutral",
+    "category": "general",
+    "summary": "No summary available",
+}
+
+SOURCE_FIELDS = {
+    "source": "mongodb",
+    "data_source": "Facebook API Analysis",
+    "analysis_method": "AI-powered social media monitoring",
+}
+
+
+def urgency_weight(urgency_level):
+    """Convert urgency to numeric weight for sorting"""
+    return URGENCY_WEIGHTS.get((urgency_level or "").lower(), 0)
+
+
+def status_display(status):
+    """Format status for display"""
+    return STATUS_DISPLAY.get(status, (status or "").title())
+
+
+def reported_at(complaint):
+    """(datetime, state): state is "stored", "unknown" or "invalid" """
+    try:
+        if complaint.get("created_at"):
+            # Native datetime; render the stored UTC wall clock as before
+            return complaint["created_at"].replace(tzinfo=None), "stored"
+        if complaint.get("date") and complaint.get("time"):
+            # Legacy documents not yet migrated to created_at
+            return (
+                datetime.strptime(
+                    f"{complaint['date']} {complaint['time']}", "%Y-%m-%d %H:%M:%S"
+                ),
+                "stored",
+            )
+        return datetime.now(), "unknown"
+    except Exception as e:
+        print(f"⚠️  Date parsing error: {e}")
+        return datetime.now(), "invalid"
+
+
+# Field groups: each producer fills the fields that share its inputs, and
+# only the groups with a requested field run
+
+
+def _identity_fields(complaint):
+    return {
+        "id": complaint.get("facebook_post_id", str(complaint.get("_id", "unknown"))),
+        "mongodb_id": str(complaint.get("_id", "")),
+    }
+
+
+def _copied_fields(complaint):
+    return {
+        name: complaint.get(field, default)
+        for name, (field, default) in COPIED_FIELDS.items()
+    }
+
+
+def _analysis_fields(complaint):
+    ai_analysis = complaint.get("ai_analysis") or {}
+    fields = {
+        name: ai_analysis.get(name, default)
+        for name, default in ANALYSIS_FIELDS.items()
+    }
+    fields["suggested_actions"] = ai_analysis.get("suggested_actions") or []
+    return fields
+
+
+def _status_fields(complaint):
+    return {"status_display": status_display(complaint.get("status", "pending_review"))}
+
+
+def _timestamp_fields(complaint):
+    return {"timestamp": reported_at(complaint)[0].isoformat()}
+
+
+def _time_string_fields(complaint):
+    dt, state = reported_at(complaint)
+    if state == "stored":
+        # Your preferred format: "Wednesday, July 23, 2025 at 12:31 AM IST"
+        formatted_datetime = dt.strftime(DISPLAY_FORMAT)
+    elif state == "unknown":
+        formatted_datetime = complaint.get("processing_timestamp", "Unknown time")
+    else:
+        formatted_datetime = "Invalid date format"
+    invalid = state == "invalid"
+    return {
+        "createdAt": formatted_datetime,
+        "formatted_datetime": formatted_datetime,
+        "date_only": "Unknown date" if invalid else dt.strftime(DATE_FORMAT),
+        "time_only": "Unknown time" if invalid else dt.strftime(TIME_FORMAT),
+    }
+
+
+def _action_fields(complaint):
+    ai_analysis = complaint.get("ai_analysis") or {}
+    officer = complaint.get("recommended_officer")
+    return {
+        "urgency_weight": urgency_weight(ai_analysis.get("urgency_level", "low")),
+        "action_priority": len(ai_analysis.get("suggested_actions") or []) > 0,
+        "has_media": bool(
+            complaint.get("image_link", "") or complaint.get("video_link", "")
+        ),
+        "requires_immediate_action": (
+            complaint.get("priority_score", 1) >= 4
+            or ai_analysis.get("urgency_level") == "high"
+        ),
+        "has_officer_assigned": bool(officer and officer != "To be assigned"),
+    }
+
+
+def _location_fields(complaint):
+    location_data = complaint.get("location_data") or {}
+    location_info = {
+        "location": location_data.get("location", "Not identified"),
+        "type": location_data.get("type", "Unknown"),
+        "confidence": location_data.get("confidence", 0),
+        "method": location_data.get("method", "Not specified"),
+        "is_identified": bool(
+            location_data.get("location") and location_data.get("location") != "area"
+        ),
+    }
+    return {
+        "location_data": location_info,
+        "location": location_info["location"],
+        "location_confidence": location_info["confidence"],
+        "location_identified": location_info["is_identified"],
+        "has_location": location_info["is_identified"],
+    }
+
+
+def _age_fields(complaint):
+    dt, state = reported_at(complaint)
+    days = (datetime.now() - dt).days if state == "stored" else 0
+    return {"days_since_reported": days}
+
+
+def _source_fields(complaint):
+    return dict(SOURCE_FIELDS)
+
+
+FIELD_GROUPS = (
+    (_identity_fields, ("id", "mongodb_id")),
+    (_copied_fields, tuple(COPIED_FIELDS)),
+    (_analysis_fields, (*ANALYSIS_FIELDS, "suggested_actions")),
+    (_status_fields, ("status_display",)),
+    (_timestamp_fields, ("timestamp",)),
+    (
+        _time_string_fields,
+        ("createdAt", "formatted_datetime", "date_only", "time_only"),
+    ),
+    (
+        _action_fields,
+        (
+            "urgency_weight",
+            "action_priority",
+            "has_media",
+            "requires_immediate_action",
+            "has_officer_assigned",
+        ),
+    ),
+    (
+        _location_fields,
+        (
+            "location_data",
+            "location",
+            "location_confidence",
+            "location_identified",
+            "has_location",
+        ),
+    ),
+    (_age_fields, ("days_since_reported",)),
+    (_source_fields, tuple(SOURCE_FIELDS)),
+)
+
+# Groups fixed by the pipeline-owned content of a complaint, stored whole in
+# its "display" subdocument at write time. Status-derived and time-relative
+# fields (status_display, days_since_reported) stay computed per request.
+STORED_GROUPS = (
+    _timestamp_fields,
+    _time_string_fields,
+    _action_fields,
+    _location_fields,
+)
+_TIME_GROUPS = (_timestamp_fields, _time_string_fields)
+
+# Every output field, in the order of the full government object
+COMPLAINT_FIELDS = (
+    # Basic identification
+    "id",
+    "mongodb_id",
+    # Citizen information
+    "name",
+    "profile_name",
+    # Complaint content
+    "description",
+    "complaint_query",
+    "original_message",
+    # Time information
+    "timestamp",
+    "createdAt",
+    "formatted_datetime",
+    "date_only",
+    "time_only",
+    "processing_time",
+    "last_updated",
+    # Priority and urgency
+    "priority_score",
+    "urgency_level",
+    "urgency_weight",
+    # Department assignment
+    "department",
+    "recommended_officer",
+    # Status tracking
+    "status",
+    "status_display",
+    # AI Analysis results
+    "sentiment",
+    "category",
+    "summary",
+    "suggested_actions",
+    "action_priority",
+    # Location analysis
+    "location_data",
+    "location",
+    "location_confidence",
+    "location_identified",
+    # Media links
+    "facebook_link",
+    "image_link",
+    "video_link",
+    "has_media",
+    # Government action metadata
+    "requires_immediate_action",
+    "has_location",
+    "has_officer_assigned",
+    "days_since_reported",
+    # Source tracking
+    "source",
+    "data_source",
+    "analysis_method",
+)
+
+# Named field sets for ?profile=
+COMPLAINT_PROFILES = {
+    "full": COMPLAINT_FIELDS,
+    # One value per concept, no aliases, constants or derived booleans
+    "compact": (
+        "id",
+        "name",
+        "description",
+        "timestamp",
+        "createdAt",
+        "priority_score",
+        "urgency_level",
+        "department",
+        "status",
+        "summary",
+        "location",
+        "facebook_link",
+        "image_link",
+        "video_link",
+    ),
+}
+
+
+def resolve_fields(profile=None, fields=None):
+    """Field tuple for ?profile= / ?fields=; ValueError on unknown names"""
+    if fields:
+        requested = tuple(name.strip() for name in fields.split(",") if name.strip())
+        if not requested:
+            raise ValueError("fields must name at least one field")
+        unknown = [name for name in requested if name not in COMPLAINT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return requested
+
+    profile = profile or "full"
+    if profile not in COMPLAINT_PROFILES:
+        raise ValueError(
+            f"profile must be one of {', '.join(sorted(COMPLAINT_PROFILES))}"
+        )
+    return COMPLAINT_PROFILES[profile]
+
+
+@lru_cache(maxsize=128)
+def _groups_for(fields):
+    """(producer, first field) of every group a field tuple needs"""
+    wanted = set(fields)
+    return tuple(
+        (producer, names[0])
+        for producer, names in FIELD_GROUPS
+        if wanted.intersection(names)
+    )
+
+
+def format_complaint(complaint, fields=None):
+    """Government view of one stored complaint, computing only `fields`"""
+    fields = fields or COMPLAINT_FIELDS
+    display = complaint.get("display") or {}
+    values = {}
+    for producer, first_field in _groups_for(fields):
+        # Stored groups are written whole, so one field stands for the group
+        if first_field not in display:
+            values.update(producer(complaint))
+    if not display:
+        return {name: values[name] for name in fields}
+    return {name: values[name] if name in values else display[name] for name in fields}
+
+
+def compute_display(complaint):
+    """The "display" subdocument for a complaint about to be written"""
+    groups = STORED_GROUPS
+    if reported_at(complaint)[1] != "stored":
+        # No real report time yet; "now" must not be frozen into the document
+        groups = [group for group in groups if group not in _TIME_GROUPS]
+    display = {}
+    for producer in groups:
+        display.update(producer(complaint))
+    return display
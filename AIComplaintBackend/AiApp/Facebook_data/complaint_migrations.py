@@ -0,0 +1,206 @@
+# complaint_migrations.py - Online, batched backfills of derived complaint fields
+import time
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from config import Config
+
+
+def _legacy_created_at(complaint):
+    """created_at from the old "date"/"time" strings (stored in UTC)"""
+    date_str = complaint.get("date")
+    time_str = complaint.get("time") or "00:00:00"
+    if date_str:
+        try:
+            return datetime.strptime(
+                f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S"
+            ).replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    # Unparseable or missing strings: fall back to the insert time in the _id
+    return complaint["_id"].generation_time
+
+
+def migrate_created_at(collection, batch_size=None, pause_seconds=0.1):
+    """Add a native created_at datetime to every complaint that lacks one.
+
+    Works in small batches with a short pause between them so it can run
+    against the live collection while the scheduler and dashboard are up.
+    Re-running it is safe: only documents without created_at are touched.
+    """
+    batch_size = batch_size or Config.MIGRATION_BATCH_SIZE
+    migrated = 0
+
+    while True:
+        batch = list(
+            collection.find(
+                {"created_at": {"$exists": False}}, {"date": 1, "time": 1}
+            ).limit(batch_size)
+        )
+        if not batch:
+            break
+
+        operations = [
+            UpdateOne(
+                {"_id": complaint["_id"], "created_at": {"$exists": False}},
+                {"$set": {"created_at": _legacy_created_at(complaint)}},
+            )
+            for complaint in batch
+        ]
+        result = collection.bulk_write(operations, ordered=False)
+        migrated += result.modified_count
+        print(f"   🔄 created_at migrated: {migrated} complaints")
+
+        if len(batch) < batch_size:
+            break
+        time.sleep(pause_seconds)
+
+    print(f"✅ created_at migration complete ({migrated} complaints updated)")
+    return migrated
+
+
+def migrate_triage_rank(collection, batch_size=None, pause_seconds=0.1):
+    """Add triage_rank to every complaint that lacks one (run after created_at)"""
+    from mongodb_data_service import triage_rank
+
+    batch_size = batch_size or Config.MIGRATION_BATCH_SIZE
+    migrated = 0
+
+    while True:
+        batch = list(
+            collection.find(
+                {"triage_rank": {"$exists": False}},
+                {"priority_score": 1, "ai_analysis.urgency_level": 1, "created_at": 1},
+            ).limit(batch_size)
+        )
+        if not batch:
+            break
+
+        operations = [
+            UpdateOne(
+                {"_id": complaint["_id"]},
+                {
+                    "$set": {
+                        "triage_rank": triage_rank(
+                            complaint.get("priority_score"),
+                            (complaint.get("ai_analysis") or {}).get("urgency_level"),
+                            complaint.get("created_at")
+                            or complaint["_id"].generation_time,
+                        )
+                    }
+                },
+            )
+            for complaint in batch
+        ]
+        result = collection.bulk_write(operations, ordered=False)
+        migrated += result.modified_count
+        print(f"   🔄 triage_rank migrated: {migrated} complaints")
+
+        if len(batch) < batch_size:
+            break
+        time.sleep(pause_seconds)
+
+    print(f"✅ triage_rank migration complete ({migrated} complaints updated)")
+    return migrated
+
+
+def migrate_change_seq(collection, batch_size=None, pause_seconds=0.1):
+    """Give complaints written before delta sync a change_seq (oldest first)"""
+    from mongo_client import release_sequence, reserve_sequence
+    from mongodb_data_service import CHANGE_SEQ_COUNTER
+
+    batch_size = batch_size or Config.MIGRATION_BATCH_SIZE
+    migrated = 0
+
+    while True:
+        batch = list(
+            collection.find({"change_seq": {"$exists": False}}, {"_id": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+
+        # Pending until written, like every other change_seq write
+        first_seq = reserve_sequence(
+            collection.database, CHANGE_SEQ_COUNTER, len(batch), pending=True
+        )
+        operations = [
+            UpdateOne(
+                {"_id": complaint["_id"], "change_seq": {"$exists": False}},
+                {"$set": {"change_seq": first_seq + offset}},
+            )
+            for offset, complaint in enumerate(batch)
+        ]
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+        finally:
+            release_sequence(
+                collection.database,
+                CHANGE_SEQ_COUNTER,
+                first_seq,
+                Config.CHANGE_SEQ_PENDING_TIMEOUT_SECONDS,
+            )
+        migrated += result.modified_count
+        print(f"   🔄 change_seq migrated: {migrated} complaints")
+
+        if len(batch) < batch_size:
+            break
+        time.sleep(pause_seconds)
+
+    print(f"✅ change_seq migration complete ({migrated} complaints updated)")
+    return migrated
+
+
+def migrate_display(collection, batch_size=None, pause_seconds=0.1):
+    """Precompute the "display" subdocument for complaints that lack one"""
+    from complaint_formatter import compute_display
+
+    batch_size = batch_size or Config.MIGRATION_BATCH_SIZE
+    migrated = 0
+
+    while True:
+        batch = list(collection.find({"display": {"$exists": False}}).limit(batch_size))
+        if not batch:
+            break
+
+        operations = [
+            UpdateOne(
+                {"_id": complaint["_id"], "display": {"$exists": False}},
+                {"$set": {"display": compute_display(complaint)}},
+            )
+            for complaint in batch
+        ]
+        result = collection.bulk_write(operations, ordered=False)
+        migrated += result.modified_count
+        print(f"   🔄 display migrated: {migrated} complaints")
+
+        if len(batch) < batch_size:
+            break
+        time.sleep(pause_seconds)
+
+    print(f"✅ display migration complete ({migrated} complaints updated)")
+    return migrated
+
+
+def run_migrations(service):
+    """Every migration above on the hot and archive collections, in order.
+
+    Run by the scheduler at startup, so each deploy backfills documents
+    written by older releases; cheap when there is nothing left to do.
+    """
+    migrated = 0
+    for collection in (service.complaints_collection, service.archive_collection):
+        migrated += migrate_created_at(collection)
+        migrated += migrate_triage_rank(collection)
+        migrated += migrate_change_seq(collection)
+        migrated += migrate_display(collection)
+    if migrated:
+        # Cached responses predate the backfilled fields
+        service.bump_generation()
+    return migrated
+
+
+if __name__ == "__main__":
+    from mongodb_data_service import MongoDBComplaintService
+
+    run_migrations(MongoDBComplaintService())
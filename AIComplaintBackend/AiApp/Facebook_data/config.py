@@ -51,6 +51,120 @@ Excise Department:
     FACEBOOK_DELAY = 0.5
     GROQ_DELAY = 1.0
 
+    # Deadline budgets (seconds) - RUN_DEADLINE_SECONDS unset means no run limit
+    POST_DEADLINE_SECONDS = float(os.getenv("POST_DEADLINE_SECONDS", "30"))
+    RUN_DEADLINE_SECONDS = (
+        float(os.getenv("RUN_DEADLINE_SECONDS"))
+        if os.getenv("RUN_DEADLINE_SECONDS")
+        else None
+    )
+    GROQ_TIMEOUT = 20
+    FACEBOOK_TIMEOUT = 30
+    SCRAPER_TIMEOUT = 10
+    MEDIA_CHECK_TIMEOUT = 5
+
+    # Run checkpointing (crash-resume journal)
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")
+    CHECKPOINT_MAX_AGE_HOURS = 24
+
+    # Dead-letter queue for failed posts
+    DLQ_MAX_ATTEMPTS = int(os.getenv("DLQ_MAX_ATTEMPTS", "5"))
+    DLQ_BASE_BACKOFF_SECONDS = 120
+    DLQ_MAX_BACKOFF_SECONDS = 6 * 3600
+    DLQ_RETRY_BATCH_SIZE = 20
+
+    # Historical backfill - its own request budget so the live scheduler keeps
+    # the larger share of MAX_REQUESTS_PER_HOUR. The two processes do not share
+    # a counter: keep both budgets together within the API quota.
+    BACKFILL_MAX_REQUESTS_PER_HOUR = int(
+        os.getenv("BACKFILL_MAX_REQUESTS_PER_HOUR", "60")
+    )
+    BACKFILL_FACEBOOK_DELAY = 2.0
+    BACKFILL_GROQ_DELAY = 3.0
+    BACKFILL_PARALLELISM = int(os.getenv("BACKFILL_PARALLELISM", "2"))
+    BACKFILL_SAVE_BATCH_SIZE = 25
+    # A chunk whose fetch fails (rate limit, Graph error) is retried with
+    # exponential backoff before it is recorded as "failed"
+    BACKFILL_CHUNK_RETRIES = int(os.getenv("BACKFILL_CHUNK_RETRIES", "3"))
+    BACKFILL_RETRY_DELAY = 60
+
+    # MongoDB connection (one shared client per process)
+    MONGODB_URI = os.getenv("MONGODB_URI")
+    MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "complaint_database")
+    MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "20"))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = 10000
+
+    # Command monitoring: per-shape latency stats and a slow-query log
+    MONGO_COMMAND_MONITORING = (
+        os.getenv("MONGO_COMMAND_MONITORING", "true").lower() == "true"
+    )
+    MONGO_SLOW_QUERY_MS = float(os.getenv("MONGO_SLOW_QUERY_MS", "100"))
+    MONGO_SLOW_QUERY_LOG = "logs/mongo_slow_queries.log"
+    # Required by /api/admin/* and POST /api/complaints/status; while unset
+    # those endpoints answer 403
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Keep writing the old "date"/"time" strings next to created_at until
+    # every reader is on created_at, then set WRITE_LEGACY_DATE_FIELDS=false
+    WRITE_LEGACY_DATE_FIELDS = (
+        os.getenv("WRITE_LEGACY_DATE_FIELDS", "true").lower() == "true"
+    )
+    MIGRATION_BATCH_SIZE = 500
+
+    # MongoDB bulk writes
+    MONGODB_BULK_CHUNK_SIZE = int(os.getenv("MONGODB_BULK_CHUNK_SIZE", "500"))
+
+    # Keyset pagination for /api/complaints
+    COMPLAINTS_DEFAULT_PAGE_SIZE = 25
+    COMPLAINTS_MAX_PAGE_SIZE = 100
+
+    # Largest JSON body accepted by POST endpoints
+    MAX_REQUEST_BODY_BYTES = 16 * 1024
+
+    # Delta sync (/api/complaints/changes): most complaints per response
+    COMPLAINT_CHANGES_BATCH_SIZE = 500
+    # A change_seq reservation still pending after this long belongs to a
+    # writer that died; readers stop waiting for it
+    CHANGE_SEQ_PENDING_TIMEOUT_SECONDS = 120
+
+    # Dashboard response cache, invalidated by the complaints write generation
+    RESPONSE_CACHE_ENABLED = (
+        os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    )
+    RESPONSE_CACHE_MAX_BYTES = int(
+        os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+    )
+    RESPONSE_CACHE_GENERATION_TTL_SECONDS = 2
+    RESPONSE_CACHE_MAX_STALE_SECONDS = 300
+    # Cached copies of clock-dependent responses (stats, timeFilter lists,
+    # days_since_reported) are recomputed at least this often
+    TIME_RELATIVE_SLOT_SECONDS = 300
+
+    # Response compression (gzip, plus brotli when the module is installed)
+    COMPRESSION_MIN_BYTES = 1024
+    COMPRESSION_STREAM_BYTES = 2 * 1024 * 1024
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+
+    # Live complaint events (/api/stream), kept in a capped collection
+    EVENT_LOG_MAX_BYTES = 16 * 1024 * 1024
+    EVENT_LOG_MAX_EVENTS = 20000
+    # How long a reader holds events back behind a missing lower id
+    EVENT_LOG_GAP_WAIT_SECONDS = 5
+    SSE_HEARTBEAT_SECONDS = 15
+    SSE_RETRY_MS = 3000
+    # Streams end after this long; EventSource reconnects with Last-Event-ID
+    SSE_MAX_STREAM_SECONDS = 300
+    # Each open stream holds a server thread (see gunicorn.conf.py threads)
+    SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", "4"))
+
+    # Hot/archive tiering: closed complaints move to complaints_archive
+    ARCHIVE_STATUSES = ["resolved", "rejected"]
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+    ARCHIVE_BATCH_SIZE = 200
+    ARCHIVE_EVERY_RUNS = 60  # scheduler runs are a minute apart
+
     # Validation settings
     MIN_COMPLAINT_LENGTH = 2  # Reduced from 15
     MIN_MEANINGFUL_WORDS = 1  # Reduced from 5 - allows "bad road condition"
@@ -1,409 +1,811 @@
 # dashboard_server.py - Complete MongoDB Dashboard Server
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import hashlib
+import hmac
 import json
+import socketserver
+import threading
+import time
 import urllib.parse as urlparse
-from mongodb_data_service import MongoDBComplaintService
-from datetime import datetime, timedelta
+from wsgiref.simple_server import WSGIServer, make_server
+from mongodb_data_service import (
+    MongoDBComplaintService,
+    COMPLAINT_PROJECTIONS,
+    decode_change_token,
+    encode_change_token,
+)
+from mongo_monitor import command_monitor
+from complaint_formatter import format_complaint, resolve_fields, status_display
+from response_cache import ResponseCache
+from response_compression import (
+    SUPPORTED_ENCODINGS,
+    compress,
+    iter_compressed,
+    negotiate_encoding,
+)
+from config import Config
+from datetime import datetime, timedelta, timezone
 import traceback
 
+HTTP_STATUS = {
+    200: "200 OK",
+    204: "204 No Content",
+    304: "304 Not Modified",
+    400: "400 Bad Request",
+    403: "403 Forbidden",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+    500: "500 Internal Server Error",
+    503: "503 Service Unavailable",
+}
+
+# Endpoints whose responses depend only on complaint data and query string
+CACHED_ROUTES = {
+    "/api/complaints",
+    "/api/complaints/changes",
+    "/api/stats",
+    "/api/departments",
+    "/api/locations",
+}
+
+# Responses that also change with the clock, not only with writes:
+# /api/stats (daily trend, last_updated) always, complaint lists when they
+# use timeFilter or carry days_since_reported. Their cache keys include a
+# TIME_RELATIVE_SLOT_SECONDS slot so cached copies age out.
+TIME_RELATIVE_ROUTES = {"/api/stats"}
+TIME_RELATIVE_FIELD_ROUTES = {"/api/complaints", "/api/complaints/changes"}
+
+# Polled endpoints always revalidate (a 304 is cheap); slow-moving lists may
+# be reused by the browser for a while
+CACHE_CONTROL = {
+    "/api/complaints": "no-cache",
+    "/api/complaints/changes": "no-cache",
+    "/api/stats": "max-age=15, must-revalidate",
+    "/api/departments": "max-age=300",
+    "/api/locations": "max-age=300",
+}
+
+CORS_HEADERS = [
+    ("Access-Control-Allow-Origin", "*"),
+    ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+    (
+        "Access-Control-Allow-Headers",
+        "Content-Type, If-None-Match, Last-Event-ID, X-Admin-Token",
+    ),
+    ("Access-Control-Expose-Headers", "ETag"),
+]
+
+
+class HTTPError(Exception):
+    """Raised by endpoint methods to answer with a non-200 status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _EventStream:
+    """WSGI body for one SSE client; frees its stream slot when closed"""
+
+    def __init__(self, events, release):
+        self.events = events
+        self.release = release
+
+    def __iter__(self):
+        return self.events
+
+    def close(self):
+        try:
+            self.events.close()
+        finally:
+            self.release()
+
+
+class ComprehensiveDashboardApp:
+    """WSGI application serving the dashboard API.
+
+    Run it under gunicorn (see gunicorn.conf.py) for multiple workers and
+    threads with keep-alive, or with `python dashboard_server.py` for a
+    threaded development server.
+    """
 
-class ComprehensiveDashboardHandler(BaseHTTPRequestHandler):
     mongodb_service = MongoDBComplaintService()
 
-    def do_GET(self):
-        # Enable CORS for browser access
-        self.send_response(200)
-        self.send_header("Content-type", "application/json")
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+    def __init__(self):
+        self.routes = {
+            "/api/complaints": lambda environ, params: self.get_enhanced_complaints(
+                params
+            ),
+            "/api/complaints/changes": lambda environ, params: (
+                self.get_complaint_changes(params)
+            ),
+            "/api/stats": lambda environ, params: self.get_comprehensive_stats(),
+            "/api/departments": lambda environ, params: self.get_departments_list(
+                params
+            ),
+            "/api/locations": lambda environ, params: self.get_locations_summary(
+                params
+            ),
+            "/api/admin/mongo-stats": self.get_mongo_stats,
+            "/api/admin/cache-stats": self.get_cache_stats,
+            "/health": lambda environ, params: {
+                "status": "healthy",
+                "timestamp": datetime.now().isoformat(),
+            },
+        }
+        # POST endpoints that change complaint data (admin token required)
+        self.actions = {"/api/complaints/status": self.update_complaint_status}
+        # Long-lived responses that write straight to the socket
+        self.streams = {"/api/stream": self.stream_events}
+        self._stream_slots = threading.BoundedSemaphore(Config.SSE_MAX_CLIENTS)
+
+        self.response_cache = None
+        if Config.RESPONSE_CACHE_ENABLED:
+            self.response_cache = ResponseCache(
+                Config.RESPONSE_CACHE_MAX_BYTES,
+                self.mongodb_service.get_generation,
+                generation_ttl=Config.RESPONSE_CACHE_GENERATION_TTL_SECONDS,
+                max_stale=Config.RESPONSE_CACHE_MAX_STALE_SECONDS,
+            )
+
+    def __call__(self, environ, start_response):
+        method = environ.get("REQUEST_METHOD", "GET")
+        path = environ.get("PATH_INFO") or "/"
+        query_params = urlparse.parse_qs(environ.get("QUERY_STRING", ""))
 
-        # Parse URL and parameters
-        parsed_path = urlparse.urlparse(self.path)
-        query_params = urlparse.parse_qs(parsed_path.query)
+        # CORS preflight
+        if method == "OPTIONS":
+            return self._respond(start_response, 204, None)
+
+        if method == "POST" and path in self.actions:
+            return self._call_uncached(
+                start_response, method, self.actions[path], environ, query_params
+            )
+
+        if method not in ("GET", "HEAD"):
+            return self._respond(
+                start_response, 405, {"error": f"Method {method} not allowed"}
+            )
+
+        stream = self.streams.get(path)
+        if stream is not None:
+            return stream(environ, start_response, query_params, head=method == "HEAD")
+
+        route = self.routes.get(path)
+        if route is None:
+            return self._respond(
+                start_response,
+                404,
+                {
+                    "error": "Endpoint not found",
+                    "available_endpoints": sorted(
+                        [*self.routes, *self.streams, *self.actions]
+                    ),
+                },
+                head=method == "HEAD",
+            )
+
+        if path not in CACHED_ROUTES:
+            return self._call_uncached(
+                start_response, method, route, environ, query_params
+            )
+
+        time_slot = self._time_slot(path, query_params)
+        key = self._cache_key(path, query_params, time_slot)
+        # Clock-dependent bodies (now() in stats, per-worker render times)
+        # are only semantically equal within a slot: weak validators
+        weak = time_slot is not None
+        if_none_match = environ.get("HTTP_IF_NONE_MATCH")
+
+        def render(generation):
+            body = self._serialize(route(environ, query_params))
+            return (generation, body), len(body)
 
         try:
-            if parsed_path.path == "/api/complaints":
-                response = self.get_enhanced_complaints(query_params)
-            elif parsed_path.path == "/api/stats":
-                response = self.get_comprehensive_stats()
-            elif parsed_path.path == "/api/departments":
-                response = self.get_departments_list()
-            elif parsed_path.path == "/api/locations":
-                response = self.get_locations_summary()
-            elif parsed_path.path == "/health":
-                response = {
-                    "status": "healthy",
-                    "timestamp": datetime.now().isoformat(),
-                }
+            if self.response_cache is not None:
+                generation = self.response_cache.current_generation()
             else:
-                response = {
-                    "error": "Endpoint not found",
-                    "available_endpoints": [
-                        "/api/complaints",
-                        "/api/stats",
-                        "/api/departments",
-                        "/api/locations",
-                        "/health",
-                    ],
-                }
+                generation = self.mongodb_service.get_generation()
+
+            # Unchanged since the client's copy: answer from headers alone
+            matched = self._matching_etag(if_none_match, generation, key, weak)
+            if matched:
+                return self._not_modified(start_response, path, matched)
+
+            if self.response_cache is not None:
+                generation, body = self.response_cache.get_or_compute(key, render)
+            else:
+                (generation, body), _ = render(generation)
+        except HTTPError as e:
+            return self._respond(
+                start_response,
+                e.status,
+                {"error": e.message, "type": "client_error"},
+                head=method == "HEAD",
+            )
+        except Exception as e:
+            return self._server_error(start_response, e, head=method == "HEAD")
+
+        # A stale cached body carries its own (older) generation
+        matched = self._matching_etag(if_none_match, generation, key, weak)
+        if matched:
+            return self._not_modified(start_response, path, matched)
+
+        encoding = None
+        if len(body) >= Config.COMPRESSION_MIN_BYTES:
+            encoding = negotiate_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+        headers = self._validators(path, self._etag(generation, key, encoding, weak))
+        headers.append(("Vary", "Accept-Encoding"))
+
+        if encoding is None:
+            return self._respond_body(
+                start_response, 200, body, head=method == "HEAD", extra_headers=headers
+            )
 
-            self.wfile.write(json.dumps(response, default=str).encode())
+        headers.append(("Content-Encoding", encoding))
+        # Keyed by the body's generation so a variant never outlives its source
+        variant_key = (key, encoding, generation)
+        if len(body) <= Config.COMPRESSION_STREAM_BYTES:
+            compressed = self._compressed(variant_key, body, encoding)
+        elif self.response_cache is not None:
+            compressed = self.response_cache.peek(variant_key)
+        else:
+            compressed = None
+
+        if compressed is None:
+            # Large bodies go out as they are compressed (chunked, no length)
+            start_response(
+                HTTP_STATUS[200],
+                list(CORS_HEADERS)
+                + [("Content-Type", "application/json")]
+                + headers,
+            )
+            if method == "HEAD":
+                return []
+            return self._stream_compressed(variant_key, body, encoding)
+
+        return self._respond_body(
+            start_response,
+            200,
+            compressed,
+            head=method == "HEAD",
+            extra_headers=headers,
+        )
 
+    def _compressed(self, variant_key, body, encoding):
+        """Compressed body, cached next to the identity body when possible"""
+        if self.response_cache is None:
+            return compress(body, encoding)
+
+        def render(_):
+            compressed = compress(body, encoding)
+            return compressed, len(compressed)
+
+        return self.response_cache.get_or_compute(variant_key, render)
+
+    def _stream_compressed(self, variant_key, body, encoding):
+        """Send a large body as it is compressed, then cache the result so
+        later requests get it with a Content-Length"""
+        chunks = []
+        for chunk in iter_compressed(body, encoding):
+            chunks.append(chunk)
+            yield chunk
+        if self.response_cache is not None:
+            compressed = b"".join(chunks)
+            self.response_cache.put(variant_key, compressed, len(compressed))
+
+    def _call_uncached(self, start_response, method, route, environ, query_params):
+        try:
+            body = self._serialize(route(environ, query_params))
+            status = 200
+        except HTTPError as e:
+            status = e.status
+            body = self._serialize({"error": e.message, "type": "client_error"})
         except Exception as e:
-            print(f"❌ API Error: {e}")
-            traceback.print_exc()
-            error_response = {
-                "error": str(e),
+            return self._server_error(start_response, e, head=method == "HEAD")
+
+        return self._respond_body(
+            start_response,
+            status,
+            body,
+            head=method == "HEAD",
+            extra_headers=[("Cache-Control", "no-store")],
+        )
+
+    def stream_events(self, environ, start_response, query_params, head=False):
+        """Server-Sent Events: complaint, status, removed and stats events.
+
+        Resumes after the Last-Event-ID header (or ?lastEventId=) that
+        EventSource sends on reconnect; without one the stream starts at
+        the current end of the log. Complaint payloads honour the same
+        ?profile= / ?fields= as /api/complaints.
+        """
+        try:
+            fields = self._response_fields(query_params)
+            last_event_id = environ.get("HTTP_LAST_EVENT_ID") or query_params.get(
+                "lastEventId", [""]
+            )[0]
+            try:
+                after_seq = int(last_event_id) if last_event_id else None
+            except ValueError:
+                raise HTTPError(400, "Last-Event-ID must be an integer")
+        except HTTPError as e:
+            return self._respond(
+                start_response, e.status, {"error": e.message, "type": "client_error"}
+            )
+
+        headers = list(CORS_HEADERS) + [
+            ("Content-Type", "text/event-stream"),
+            ("Cache-Control", "no-store"),
+            # Stop nginx-style proxies from buffering the stream
+            ("X-Accel-Buffering", "no"),
+        ]
+        if head:
+            start_response(HTTP_STATUS[200], headers)
+            return []
+
+        if not self._stream_slots.acquire(blocking=False):
+            return self._respond_body(
+                start_response,
+                503,
+                self._serialize({"error": "Too many open streams, retry later"}),
+                extra_headers=[("Retry-After", str(Config.SSE_RETRY_MS // 1000))],
+            )
+
+        start_response(HTTP_STATUS[200], headers)
+        return _EventStream(
+            self._event_stream(after_seq, fields), self._stream_slots.release
+        )
+
+    def _event_stream(self, after_seq, fields):
+        event_log = self.mongodb_service.event_log
+        deadline = time.monotonic() + Config.SSE_MAX_STREAM_SECONDS
+        yield f"retry: {Config.SSE_RETRY_MS}\n\n".encode()
+
+        if after_seq is None:
+            after_seq = event_log.latest_seq()
+        elif event_log.has_gap(after_seq):
+            # Missed events were already dropped from the log: reload, then follow
+            after_seq = event_log.latest_seq()
+            yield self._sse_message(after_seq, "reset", {"reason": "events expired"})
+        # Give the client a resume point even if no event arrives before the
+        # stream ends, so it reconnects with Last-Event-ID instead of at the end
+        yield f"id: {after_seq}\n\n".encode()
+
+        for event in event_log.follow(after_seq, Config.SSE_HEARTBEAT_SECONDS):
+            if event is None:
+                yield b": keep-alive\n\n"
+            else:
+                after_seq = event["_id"]
+                data = dict(event["data"])
+                if event["type"] == "complaint":
+                    data["complaint"] = self._format_government_complaint(
+                        data["complaint"], fields
+                    )
+                data["facebook_post_id"] = event["facebook_post_id"]
+                data["at"] = event["at"].isoformat()
+                yield self._sse_message(event["_id"], event["type"], data)
+
+            # Hand the thread back now and then; the client resumes by id
+            if time.monotonic() >= deadline:
+                yield f"id: {after_seq}\n\n".encode()
+                return
+
+    def _sse_message(self, event_id, event_type, data):
+        return (
+            f"id: {event_id}\nevent: {event_type}\n"
+            f"data: {json.dumps(data, default=str)}\n\n"
+        ).encode()
+
+    def _server_error(self, start_response, error, head=False):
+        print(f"❌ API Error: {error}")
+        traceback.print_exc()
+        return self._respond(
+            start_response,
+            500,
+            {
+                "error": str(error),
                 "type": "server_error",
                 "timestamp": datetime.now().strftime("%A, %B %d, %Y at %I:%M %p IST"),
-            }
-            self.wfile.write(json.dumps(error_response).encode())
+            },
+            head=head,
+        )
 
-    def do_OPTIONS(self):
-        # Handle CORS preflight requests
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+    @staticmethod
+    def _etag(generation, key, encoding=None, weak=False):
+        """Validator for generation + cache key (query and, for time-relative
+        responses, clock slot) + coding. Strong means same bytes; weak ones
+        mark clock-dependent bodies that are only equivalent."""
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        suffix = f"-{encoding}" if encoding else ""
+        tag = f'"g{generation}-{digest}{suffix}"'
+        return f"W/{tag}" if weak else tag
+
+    def _matching_etag(self, if_none_match, generation, key, weak=False):
+        """Our ETag for the representation the client names, if any
+        (weak comparison, as If-None-Match uses)"""
+        if not if_none_match:
+            return None
+        current = {
+            self._etag(generation, key, encoding): encoding
+            for encoding in [None] + SUPPORTED_ENCODINGS
+        }
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            tag = tag[2:] if tag.startswith("W/") else tag
+            if tag in current:
+                return self._etag(generation, key, current[tag], weak)
+        return None
+
+    def _validators(self, path, etag):
+        return [
+            ("ETag", etag),
+            ("Cache-Control", CACHE_CONTROL.get(path, "no-cache")),
+        ]
+
+    def _not_modified(self, start_response, path, etag):
+        """304: validators only, no body"""
+        start_response(
+            HTTP_STATUS[304],
+            list(CORS_HEADERS)
+            + self._validators(path, etag)
+            + [("Vary", "Accept-Encoding")],
+        )
+        return []
+
+    @staticmethod
+    def _serialize(payload):
+        return json.dumps(payload, default=str).encode()
+
+    @staticmethod
+    def _cache_key(path, query_params, time_slot=None):
+        """Path plus query parameters in canonical order, blanks dropped,
+        plus the clock slot of time-relative responses"""
+        params = tuple(
+            sorted(
+                (name, tuple(value for value in values if value))
+                for name, values in query_params.items()
+                if any(values)
+            )
+        )
+        if time_slot is None:
+            return path, params
+        return path, params, time_slot
+
+    def _time_slot(self, path, query_params):
+        """Current clock slot if this response is time-relative, else None.
+
+        Slots are aligned to the epoch, so with the default 300 seconds a
+        new UTC (and IST) day always starts a new slot.
+        """
+        if path in TIME_RELATIVE_FIELD_ROUTES:
+            try:
+                fields = self._response_fields(query_params)
+            except HTTPError:
+                return None  # the route itself answers 400
+            if not (
+                query_params.get("timeFilter", [""])[0]
+                or "days_since_reported" in fields
+            ):
+                return None
+        elif path not in TIME_RELATIVE_ROUTES:
+            return None
+        return int(time.time() // Config.TIME_RELATIVE_SLOT_SECONDS)
+
+    def _respond(self, start_response, status, payload, head=False):
+        body = b"" if payload is None else self._serialize(payload)
+        return self._respond_body(start_response, status, body, head, payload is not None)
+
+    def _respond_body(
+        self, start_response, status, body, head=False, is_json=True, extra_headers=()
+    ):
+        """Send a serialized body with an exact Content-Length (enables keep-alive)"""
+        headers = list(CORS_HEADERS)
+        if is_json:
+            headers.append(("Content-Type", "application/json"))
+        headers.extend(extra_headers)
+        headers.append(("Content-Length", str(len(body))))
+        start_response(HTTP_STATUS[status], headers)
+        return [] if head else [body]
+
+    def _require_admin(self, environ):
+        """403 unless X-Admin-Token matches ADMIN_TOKEN; closed when it is unset"""
+        if not Config.ADMIN_TOKEN:
+            raise HTTPError(403, "Admin endpoints are disabled (ADMIN_TOKEN not set)")
+        if not hmac.compare_digest(
+            environ.get("HTTP_X_ADMIN_TOKEN", ""), Config.ADMIN_TOKEN
+        ):
+            raise HTTPError(403, "Admin token required")
+
+    @staticmethod
+    def _read_json(environ):
+        """JSON object request body; HTTPError(400) for anything else"""
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length <= 0:
+            raise HTTPError(400, "Request body required")
+        if length > Config.MAX_REQUEST_BODY_BYTES:
+            raise HTTPError(400, "Request body too large")
+        try:
+            payload = json.loads(environ["wsgi.input"].read(length))
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return payload
+
+    def _view(self, query_params):
+        """Named projection from ?view= (list by default)"""
+        view = query_params.get("view", ["list"])[0] or "list"
+        if view not in COMPLAINT_PROJECTIONS:
+            raise HTTPError(
+                400, f"view must be one of {', '.join(sorted(COMPLAINT_PROJECTIONS))}"
+            )
+        return view
+
+    def _include_archived(self, query_params):
+        """Opt-in ?include_archived=true to also read complaints_archive"""
+        value = query_params.get("include_archived", [""])[0]
+        return value.lower() in ("1", "true", "yes")
 
     def get_enhanced_complaints(self, query_params):
         """Get enhanced complaints with all government-useful parameters"""
-        try:
-            print(f"🔍 Processing complaints request: {dict(query_params)}")
+        print(f"🔍 Processing complaints request: {dict(query_params)}")
 
-            # Build MongoDB query
-            query = {}
+        # Build MongoDB query
+        query = {}
 
-            # Status filter
-            if "status" in query_params and query_params["status"][0]:
-                status = query_params["status"][0]
-                query["status"] = status
+        # Status filter
+        if "status" in query_params and query_params["status"][0]:
+            status = query_params["status"][0]
+            query["status"] = status
 
-            # Department filter
-            if "department" in query_params and query_params["department"][0]:
-                query["department"] = query_params["department"][0]
+        # Department filter
+        if "department" in query_params and query_params["department"][0]:
+            query["department"] = query_params["department"][0]
 
-            # Priority filter
-            if "priority" in query_params and query_params["priority"][0]:
+        # Priority filter
+        if "priority" in query_params and query_params["priority"][0]:
+            try:
                 query["priority_score"] = int(query_params["priority"][0])
+            except ValueError:
+                raise HTTPError(400, "priority must be an integer")
+
+        # Urgency filter
+        if "urgency" in query_params and query_params["urgency"][0]:
+            query["ai_analysis.urgency_level"] = query_params["urgency"][0]
+
+        # Location filter
+        if "location" in query_params and query_params["location"][0]:
+            location_filter = query_params["location"][0]
+            if location_filter == "identified":
+                query["location_data"] = {"$exists": True, "$ne": None}
+            elif location_filter == "unidentified":
+                query["$or"] = [
+                    {"location_data": {"$exists": False}},
+                    {"location_data": None},
+                    {"location_data.location": {"$in": ["", "area", None]}},
+                ]
+
+        # Time filter
+        if "timeFilter" in query_params and query_params["timeFilter"][0]:
+            time_filter = query_params["timeFilter"][0]
+            # created_at is stored in UTC, so ranges are computed in UTC too
+            now = datetime.now(timezone.utc)
+
+            if time_filter == "today":
+                today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+                query["created_at"] = {"$gte": today_start}
+            elif time_filter == "week":
+                query["created_at"] = {"$gte": now - timedelta(days=7)}
+            elif time_filter == "month":
+                query["created_at"] = {"$gte": now - timedelta(days=30)}
+
+        print(f"📊 MongoDB query: {query}")
+
+        # Only the fields of the requested view leave MongoDB
+        view = self._view(query_params)
+
+        # Only the requested output fields are computed and serialized
+        fields = self._response_fields(query_params)
+
+        # Opt-in keyset pagination: ?limit=N and/or ?cursor=<next_cursor>
+        if "limit" in query_params or "cursor" in query_params:
+            return self._get_complaints_page(query, view, fields, query_params)
+
+        # Get complaints from MongoDB
+        complaints = self.mongodb_service.find_complaints(
+            query, view=view, include_archived=self._include_archived(query_params)
+        )
+        print(f"✅ Found {len(complaints)} complaints")
 
-            # Urgency filter
-            if "urgency" in query_params and query_params["urgency"][0]:
-                query["ai_analysis.urgency_level"] = query_params["urgency"][0]
-
-            # Location filter
-            if "location" in query_params and query_params["location"][0]:
-                location_filter = query_params["location"][0]
-                if location_filter == "identified":
-                    query["location_data"] = {"$exists": True, "$ne": None}
-                elif location_filter == "unidentified":
-                    query["$or"] = [
-                        {"location_data": {"$exists": False}},
-                        {"location_data": None},
-                        {"location_data.location": {"$in": ["", "area", None]}},
-                    ]
-
-            # Time filter
-            if "timeFilter" in query_params and query_params["timeFilter"][0]:
-                time_filter = query_params["timeFilter"][0]
-                now = datetime.now()
-
-                if time_filter == "today":
-                    query["date"] = now.strftime("%Y-%m-%d")
-                elif time_filter == "week":
-                    week_ago = (now - timedelta(days=7)).strftime("%Y-%m-%d")
-                    query["date"] = {"$gte": week_ago}
-                elif time_filter == "month":
-                    month_ago = (now - timedelta(days=30)).strftime("%Y-%m-%d")
-                    query["date"] = {"$gte": month_ago}
-
-            print(f"📊 MongoDB query: {query}")
-
-            # Get complaints from MongoDB
-            complaints = list(self.mongodb_service.complaints_collection.find(query))
-            print(f"✅ Found {len(complaints)} complaints")
-
-            # Format complaints for government dashboard
-            formatted_complaints = []
-            for complaint in complaints:
-                formatted_complaint = self._format_government_complaint(complaint)
-                formatted_complaints.append(formatted_complaint)
-
-            # Sort by priority and urgency
-            formatted_complaints.sort(
-                key=lambda x: (
-                    -x.get("priority_score", 0),
-                    self._get_urgency_weight(x.get("urgency_level", "low")),
-                    x.get("timestamp", ""),
-                ),
-                reverse=True,
-            )
-
-            print(f"🎯 Returning {len(formatted_complaints)} formatted complaints")
-            return formatted_complaints
+        # Format complaints for government dashboard, keeping MongoDB's
+        # triage_rank order
+        formatted_complaints = []
+        for complaint in complaints:
+            formatted_complaint = self._format_government_complaint(complaint, fields)
+            formatted_complaints.append(formatted_complaint)
 
-        except Exception as e:
-            print(f"❌ Error getting complaints: {e}")
-            traceback.print_exc()
-            return []
+        print(f"🎯 Returning {len(formatted_complaints)} formatted complaints")
+        return formatted_complaints
 
-    def _format_government_complaint(self, complaint):
-        """Format complaint with all parameters for government action"""
+    def _get_complaints_page(self, query, view, fields, query_params):
+        """Paginated envelope: one page of complaints plus next_cursor"""
+        limit = query_params.get("limit", [""])[0]
+        try:
+            limit = int(limit) if limit else Config.COMPLAINTS_DEFAULT_PAGE_SIZE
+        except ValueError:
+            raise HTTPError(400, "limit must be an integer")
+        if limit < 1:
+            raise HTTPError(400, "limit must be positive")
+        limit = min(limit, Config.COMPLAINTS_MAX_PAGE_SIZE)
 
-        # Parse timestamp for your preferred date format
         try:
-            if complaint.get("date") and complaint.get("time"):
-                dt = datetime.strptime(
-                    f"{complaint['date']} {complaint['time']}", "%Y-%m-%d %H:%M:%S"
-                )
-                timestamp = dt.isoformat()
-                # Your preferred format: "Wednesday, July 23, 2025 at 12:31 AM IST"
-                formatted_datetime = dt.strftime("%A, %B %d, %Y at %I:%M %p IST")
-                date_only = dt.strftime("%A, %B %d, %Y")
-                time_only = dt.strftime("%I:%M %p IST")
-            else:
-                dt = datetime.now()
-                timestamp = dt.isoformat()
-                formatted_datetime = complaint.get(
-                    "processing_timestamp", "Unknown time"
-                )
-                date_only = dt.strftime("%A, %B %d, %Y")
-                time_only = dt.strftime("%I:%M %p IST")
-        except Exception as e:
-            print(f"⚠️  Date parsing error: {e}")
-            dt = datetime.now()
-            timestamp = dt.isoformat()
-            formatted_datetime = "Invalid date format"
-            date_only = "Unknown date"
-            time_only = "Unknown time"
-
-        # Extract AI analysis data
-        ai_analysis = complaint.get("ai_analysis", {})
-        location_data = complaint.get("location_data", {})
-
-        # Media links
-        facebook_link = complaint.get("facebook_permalink", "")
-        image_link = complaint.get("image_link", "")
-        video_link = complaint.get("video_link", "")
-
-        # Location information
-        location_info = {
-            "location": location_data.get("location", "Not identified"),
-            "type": location_data.get("type", "Unknown"),
-            "confidence": location_data.get("confidence", 0),
-            "method": location_data.get("method", "Not specified"),
-            "is_identified": bool(
-                location_data.get("location")
-                and location_data.get("location") != "area"
-            ),
+            complaints, next_cursor = self.mongodb_service.find_complaints_page(
+                query,
+                limit,
+                cursor=query_params.get("cursor", [""])[0] or None,
+                view=view,
+                include_archived=self._include_archived(query_params),
+            )
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+        # Already in page order from the index; do not re-sort
+        return {
+            "complaints": [
+                self._format_government_complaint(complaint, fields)
+                for complaint in complaints
+            ],
+            "limit": limit,
+            "next_cursor": next_cursor,
         }
 
-        # Government action requirements
-        suggested_actions = ai_analysis.get("suggested_actions", [])
-        requires_immediate_action = (
-            complaint.get("priority_score", 1) >= 4
-            or ai_analysis.get("urgency_level") == "high"
+    def get_complaint_changes(self, query_params):
+        """Delta sync: complaints inserted, updated or removed since ?since=.
+
+        Without a token every complaint is returned, which is the initial
+        sync. Keep calling with next_token while has_more is true.
+        """
+        token = query_params.get("since", [""])[0]
+        try:
+            since_seq = decode_change_token(token) if token else 0
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+        view = self._view(query_params)
+        fields = self._response_fields(query_params)
+
+        upserted, removed, last_seq, has_more = self.mongodb_service.find_changes(
+            since_seq,
+            Config.COMPLAINT_CHANGES_BATCH_SIZE,
+            view=view,
+            include_archived=self._include_archived(query_params),
+        )
+        print(
+            f"🔁 Changes since {since_seq}: "
+            f"{len(upserted)} upserted, {len(removed)} removed"
         )
 
-        # Enhanced complaint object
         return {
-            # Basic identification
-            "id": complaint.get(
-                "facebook_post_id", str(complaint.get("_id", "unknown"))
-            ),
-            "mongodb_id": str(complaint.get("_id", "")),
-            # Citizen information
-            "name": complaint.get("profile_name", "Unknown"),
-            "profile_name": complaint.get("profile_name", "Unknown"),
-            # Complaint content
-            "description": complaint.get("complaint_query", "No description"),
-            "complaint_query": complaint.get("complaint_query", "No description"),
-            "original_message": complaint.get("original_message", ""),
-            # Time information (your preferred format)
-            "timestamp": timestamp,
-            "createdAt": formatted_datetime,
-            "formatted_datetime": formatted_datetime,
-            "date_only": date_only,
-            "time_only": time_only,
-            "processing_time": complaint.get("processing_timestamp", ""),
-            "last_updated": complaint.get("last_updated", ""),
-            # Priority and urgency
-            "priority_score": complaint.get("priority_score", 1),
-            "urgency_level": ai_analysis.get("urgency_level", "low"),
-            "urgency_weight": self._get_urgency_weight(
-                ai_analysis.get("urgency_level", "low")
-            ),
-            # Department assignment
-            "department": complaint.get("department", "Not assigned"),
-            "recommended_officer": complaint.get(
-                "recommended_officer", "To be assigned"
-            ),
-            # Status tracking
-            "status": complaint.get("status", "pending_review"),
-            "status_display": self._format_status_display(
-                complaint.get("status", "pending_review")
-            ),
-            # AI Analysis results
-            "sentiment": ai_analysis.get("sentiment", "neutral"),
-            "category": ai_analysis.get("category", "general"),
-            "summary": ai_analysis.get("summary", "No summary available"),
-            "suggested_actions": suggested_actions,
-            "action_priority": len(suggested_actions) > 0,
-            # Location analysis
-            "location_data": location_info,
-            "location": location_info["location"],
-            "location_confidence": location_info["confidence"],
-            "location_identified": location_info["is_identified"],
-            # Media links
-            "facebook_link": facebook_link,
-            "image_link": image_link,
-            "video_link": video_link,
-            "has_media": bool(image_link or video_link),
-            # Government action metadata
-            "requires_immediate_action": requires_immediate_action,
-            "has_location": location_info["is_identified"],
-            "has_officer_assigned": bool(
-                complaint.get("recommended_officer")
-                and complaint.get("recommended_officer") != "To be assigned"
-            ),
-            "days_since_reported": (datetime.now() - dt).days if dt else 0,
-            # Source tracking
-            "source": "mongodb",
-            "data_source": "Facebook API Analysis",
-            "analysis_method": "AI-powered social media monitoring",
+            "upserted": [
+                self._format_government_complaint(complaint, fields)
+                for complaint in upserted
+            ],
+            "removed": removed,
+            "next_token": encode_change_token(last_seq),
+            "has_more": has_more,
         }
 
-    def _get_urgency_weight(self, urgency_level):
-        """Convert urgency to numeric weight for sorting"""
-        weights = {"high": 3, "medium": 2, "low": 1, "": 0}
-        return weights.get(urgency_level.lower(), 0)
-
-    def _format_status_display(self, status):
-        """Format status for display"""
-        status_map = {
-            "pending_review": "Pending Review",
-            "in_progress": "In Progress",
-            "resolved": "Resolved",
-            "rejected": "Rejected",
-        }
-        return status_map.get(status, status.title())
+    def _format_government_complaint(self, complaint, fields=None):
+        """Format complaint with all parameters for government action.
 
-    def get_comprehensive_stats(self):
-        """Get comprehensive statistics for dashboard"""
+        fields limits the output (and the work done) to those keys; see
+        complaint_formatter.COMPLAINT_PROFILES.
+        """
+        return format_complaint(complaint, fields)
+
+    @staticmethod
+    def _response_fields(query_params):
+        """Output fields from ?fields=a,b or ?profile=compact|full"""
         try:
-            print("📊 Generating comprehensive statistics...")
+            return resolve_fields(
+                profile=query_params.get("profile", [""])[0] or None,
+                fields=query_params.get("fields", [""])[0] or None,
+            )
+        except ValueError as e:
+            raise HTTPError(400, str(e))
 
-            all_complaints = list(self.mongodb_service.complaints_collection.find())
-            total_count = len(all_complaints)
+    def get_comprehensive_stats(self):
+        """Get comprehensive statistics for dashboard"""
+        print("📊 Generating comprehensive statistics...")
 
-            if total_count == 0:
-                return self._empty_stats()
+        # Read the incrementally maintained rollup (O(number of buckets))
+        aggregated = self.mongodb_service.get_stats_snapshot()
+        total_count = aggregated["total"]
 
-            # Initialize counters
-            status_counts = {
-                "pending_review": 0,
-                "in_progress": 0,
-                "resolved": 0,
-                "rejected": 0,
-            }
-            priority_dist = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            dept_dist = {}
-            urgency_dist = {"high": 0, "medium": 0, "low": 0}
-            location_detected = 0
-            critical_count = 0
-
-            # Process each complaint
-            for complaint in all_complaints:
-                # Status distribution
-                status = complaint.get("status", "pending_review")
-                if status in status_counts:
-                    status_counts[status] += 1
-
-                # Priority distribution
-                priority = complaint.get("priority_score", 1)
-                if priority in priority_dist:
-                    priority_dist[priority] += 1
-                if priority >= 5:
-                    critical_count += 1
-
-                # Department distribution
-                dept = complaint.get("department", "Unknown")
-                if dept and dept != "Unknown":
-                    dept_dist[dept] = dept_dist.get(dept, 0) + 1
-
-                # Urgency distribution
-                urgency = complaint.get("ai_analysis", {}).get("urgency_level", "low")
-                if urgency in urgency_dist:
-                    urgency_dist[urgency] += 1
-
-                # Location detection
-                location_data = complaint.get("location_data", {})
-                if location_data.get("location") and location_data.get(
-                    "location"
-                ) not in ["", "area", None]:
-                    location_detected += 1
-
-            # Format distributions
-            priority_distribution = [
-                {
-                    "priority": k,
-                    "count": v,
-                    "percentage": round((v / total_count) * 100, 1),
-                }
-                for k, v in priority_dist.items()
-                if v > 0
-            ]
+        if total_count == 0:
+            return self._empty_stats()
 
-            department_distribution = [
-                {
-                    "department": k,
-                    "count": v,
-                    "percentage": round((v / total_count) * 100, 1),
-                }
-                for k, v in sorted(dept_dist.items(), key=lambda x: x[1], reverse=True)
-            ]
+        status_counts = {
+            status: aggregated["status_counts"].get(status, 0)
+            for status in ["pending_review", "in_progress", "resolved", "rejected"]
+        }
+        priority_dist = {
+            priority: aggregated["priority_counts"].get(priority, 0)
+            for priority in [1, 2, 3, 4, 5]
+        }
+        dept_dist = {
+            dept: count
+            for dept, count in aggregated["department_counts"].items()
+            if dept and dept != "Unknown"
+        }
+        urgency_dist = {
+            urgency: aggregated["urgency_counts"].get(urgency, 0)
+            for urgency in ["high", "medium", "low"]
+        }
+        location_detected = aggregated["location_detected"]
+        critical_count = sum(
+            count
+            for priority, count in aggregated["priority_counts"].items()
+            if isinstance(priority, (int, float)) and priority >= 5
+        )
 
-            urgency_distribution = [
-                {
-                    "urgency": k,
-                    "count": v,
-                    "percentage": round((v / total_count) * 100, 1),
-                }
-                for k, v in urgency_dist.items()
-                if v > 0
-            ]
-
-            # Calculate trends
-            daily_trend = self._calculate_daily_trend(all_complaints)
-
-            stats = {
-                "total": total_count,
-                "critical": critical_count,
-                "pending": status_counts["pending_review"],
-                "inProgress": status_counts["in_progress"],
-                "resolved": status_counts["resolved"],
-                "rejected": status_counts["rejected"],
-                "locationDetected": location_detected,
-                "priority_distribution": priority_distribution,
-                "department_distribution": department_distribution,
-                "urgency_distribution": urgency_distribution,
-                "daily_trend": daily_trend,
-                "location_coverage": round((location_detected / total_count) * 100, 1),
-                "last_updated": datetime.now().strftime(
-                    "%A, %B %d, %Y at %I:%M %p IST"
-                ),
+        # Format distributions
+        priority_distribution = [
+            {
+                "priority": k,
+                "count": v,
+                "percentage": round((v / total_count) * 100, 1),
             }
+            for k, v in priority_dist.items()
+            if v > 0
+        ]
+
+        department_distribution = [
+            {
+                "department": k,
+                "count": v,
+                "percentage": round((v / total_count) * 100, 1),
+            }
+            for k, v in sorted(dept_dist.items(), key=lambda x: x[1], reverse=True)
+        ]
+
+        urgency_distribution = [
+            {
+                "urgency": k,
+                "count": v,
+                "percentage": round((v / total_count) * 100, 1),
+            }
+            for k, v in urgency_dist.items()
+            if v > 0
+        ]
+
+        # Calculate trends
+        daily_trend = self._calculate_daily_trend(aggregated["daily_counts"])
+
+        stats = {
+            "total": total_count,
+            "critical": critical_count,
+            "pending": status_counts["pending_review"],
+            "inProgress": status_counts["in_progress"],
+            "resolved": status_counts["resolved"],
+            "rejected": status_counts["rejected"],
+            "locationDetected": location_detected,
+            "priority_distribution": priority_distribution,
+            "department_distribution": department_distribution,
+            "urgency_distribution": urgency_distribution,
+            "daily_trend": daily_trend,
+            "location_coverage": round((location_detected / total_count) * 100, 1),
+            "last_updated": datetime.now().strftime(
+                "%A, %B %d, %Y at %I:%M %p IST"
+            ),
+        }
 
-            print(f"✅ Generated stats for {total_count} complaints")
-            return stats
-
-        except Exception as e:
-            print(f"❌ Error generating stats: {e}")
-            traceback.print_exc()
-            return self._empty_stats()
+        print(f"✅ Generated stats for {total_count} complaints")
+        return stats
 
     def _empty_stats(self):
         """Return empty stats structure"""
@@ -423,15 +825,9 @@ class ComprehensiveDashboardHandler(BaseHTTPRequestHandler):
             "last_updated": datetime.now().strftime("%A, %B %d, %Y at %I:%M %p IST"),
         }
 
-    def _calculate_daily_trend(self, complaints):
+    def _calculate_daily_trend(self, daily_counts):
         """Calculate daily complaint trend for last 7 days"""
         try:
-            daily_counts = {}
-            for complaint in complaints:
-                date_str = complaint.get("date", "")
-                if date_str:
-                    daily_counts[date_str] = daily_counts.get(date_str, 0) + 1
-
             trend = []
             for i in range(6, -1, -1):
                 date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
@@ -448,40 +844,98 @@ class ComprehensiveDashboardHandler(BaseHTTPRequestHandler):
         except:
             return []
 
-    def get_departments_list(self):
-        """Get list of departments for filtering"""
+    def update_complaint_status(self, environ, query_params):
+        """Officer status change: POST {"id": facebook_post_id, "status": ...}"""
+        self._require_admin(environ)
+        payload = self._read_json(environ)
+
+        facebook_post_id = payload.get("id")
+        if not isinstance(facebook_post_id, str) or not facebook_post_id:
+            raise HTTPError(400, "id must be a complaint id")
+        status = payload.get("status")
         try:
-            departments = self.mongodb_service.complaints_collection.distinct(
-                "department"
+            updated = self.mongodb_service.update_complaint_status(
+                facebook_post_id, status
             )
-            return [dept for dept in departments if dept and dept != "Unknown"]
-        except Exception as e:
-            print(f"Error getting departments: {e}")
-            return []
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        if not updated:
+            raise HTTPError(404, f"Complaint {facebook_post_id} not found")
 
-    def get_locations_summary(self):
-        """Get summary of detected locations"""
-        try:
-            pipeline = [
-                {"$match": {"location_data.location": {"$exists": True, "$ne": None}}},
-                {
-                    "$group": {
-                        "_id": "$location_data.location",
-                        "count": {"$sum": 1},
-                        "avg_confidence": {"$avg": "$location_data.confidence"},
-                    }
-                },
-                {"$sort": {"count": -1}},
-                {"$limit": 20},
-            ]
+        print(f"🔄 Complaint {facebook_post_id} status set to {status}")
+        return {
+            "id": facebook_post_id,
+            "status": status,
+            "status_display": status_display(status),
+        }
 
-            locations = list(
-                self.mongodb_service.complaints_collection.aggregate(pipeline)
+    def get_mongo_stats(self, environ, query_params):
+        """Per-query-shape MongoDB latency stats from the command monitor"""
+        self._require_admin(environ)
+
+        limit = query_params.get("limit", [""])[0]
+        try:
+            limit = int(limit) if limit else None
+        except ValueError:
+            raise HTTPError(400, "limit must be an integer")
+        if limit is not None and limit < 1:
+            raise HTTPError(400, "limit must be positive")
+        stats = command_monitor.snapshot(limit=limit)
+        if query_params.get("reset", [""])[0].lower() in ("1", "true", "yes"):
+            command_monitor.reset()
+        return stats
+
+    def get_cache_stats(self, environ, query_params):
+        """Response cache hit rate, size and generation"""
+        self._require_admin(environ)
+        if self.response_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.stats()}
+
+    def get_departments_list(self, query_params=None):
+        """Get list of departments for filtering"""
+        departments = self.mongodb_service.complaints_collection.distinct(
+            "department"
+        )
+        if self._include_archived(query_params or {}):
+            departments = set(departments) | set(
+                self.mongodb_service.archive_collection.distinct("department")
             )
-            return locations
-        except Exception as e:
-            print(f"Error getting locations: {e}")
-            return []
+        return [dept for dept in departments if dept and dept != "Unknown"]
+
+    def get_locations_summary(self, query_params=None):
+        """Get summary of detected locations"""
+        pipeline = []
+        if self._include_archived(query_params or {}):
+            pipeline.append({"$unionWith": "complaints_archive"})
+        pipeline += [
+            {"$match": {"location_data.location": {"$exists": True, "$ne": None}}},
+            {
+                "$group": {
+                    "_id": "$location_data.location",
+                    "count": {"$sum": 1},
+                    "avg_confidence": {"$avg": "$location_data.confidence"},
+                }
+            },
+            {"$sort": {"count": -1}},
+            {"$limit": 20},
+        ]
+
+        locations = list(
+            self.mongodb_service.complaints_collection.aggregate(pipeline)
+        )
+        return locations
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """Development server: one thread per request, so a slow query does not
+    block other clients or /health"""
+
+    daemon_threads = True
+
+
+# gunicorn entry point: gunicorn dashboard_server:application
+application = ComprehensiveDashboardApp()
 
 
 if __name__ == "__main__":
@@ -490,16 +944,23 @@ if __name__ == "__main__":
     print("🔗 Server URL: http://localhost:8000")
     print("📱 Connect your dashboard HTML to this server")
     print("🎯 Optimized for weekday, month name date formatting")
+    print("🏭 Production: gunicorn dashboard_server:application (see gunicorn.conf.py)")
     print()
 
     try:
-        server = HTTPServer(("localhost", 8000), ComprehensiveDashboardHandler)
+        server = make_server(
+            "localhost", 8000, application, server_class=ThreadingWSGIServer
+        )
         print("✅ Server initialized successfully")
         print("📡 Available endpoints:")
         print("   • /api/complaints - Enhanced complaint data")
+        print("   • /api/complaints/changes - Complaints changed since a token")
         print("   • /api/stats - Comprehensive statistics")
         print("   • /api/departments - Department list")
         print("   • /api/locations - Location summary")
+        print("   • /api/stream - Live complaint events (Server-Sent Events)")
+        print("   • POST /api/complaints/status - Change a complaint's status")
+        print("   • /api/admin/mongo-stats - MongoDB query-shape latency")
         print("   • /health - Server health check")
         print()
         print("🔄 Server ready for connections...")
@@ -1,6 +1,7 @@
 # data_processor.py - Enhanced with MongoDB support
 from datetime import datetime
 from config import Config
+from error_handler import PostProcessingError
 from mongodb_data_service import MongoDBComplaintService
 
 
@@ -114,7 +115,11 @@ class DataProcessor:
         processed_posts = []
         for i, post in enumerate(posts, 1):
             print(f"Processing post {i}/{len(posts)}...")
-            processed_post = self.process_single_post(post)
+            try:
+                processed_post = self.process_single_post(post)
+            except PostProcessingError as e:
+                print(f"   ❌ Post {i} left for a later run: {e}")
+                continue
             if processed_post:
                 processed_posts.append(processed_post)
 
@@ -132,7 +137,11 @@ class DataProcessor:
         all_processed = []
         for i, post in enumerate(posts, 1):
             print(f"Processing post {i}/{len(posts)}...")
-            processed_post = self.process_single_post(post)
+            try:
+                processed_post = self.process_single_post(post)
+            except PostProcessingError as e:
+                print(f"   ❌ Post {i} left for a later run: {e}")
+                continue
             if processed_post:
                 all_processed.append(processed_post)
 
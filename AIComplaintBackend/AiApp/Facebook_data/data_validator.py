@@ -1,6 +1,7 @@
 import re
 import requests
 from config import Config
+from deadline import deadline_timeout
 
 
 class DataValidator:
@@ -28,7 +29,7 @@ class DataValidator:
 
         return cleaned
 
-    def validate_media_urls(self, media):
+    def validate_media_urls(self, media, deadline=None):
         """Validate media URLs and preserve all media types"""
         valid_media = {"images": [], "videos": [], "links": [], "other_attachments": []}
 
@@ -37,19 +38,25 @@ class DataValidator:
             for item in media.get(media_type, []):
                 if media_type == "other_attachments":
                     valid_media[media_type].append(item)
+                elif deadline and not deadline.allows(f"media_check:{media_type}"):
+                    # Out of budget - keep the item unverified rather than drop it
+                    item["validated"] = False
+                    valid_media[media_type].append(item)
                 else:
-                    if self.is_valid_url(item.get("url", "")):
+                    if self.is_valid_url(item.get("url", ""), deadline):
                         valid_media[media_type].append(item)
 
         return valid_media
 
-    def is_valid_url(self, url):
+    def is_valid_url(self, url, deadline=None):
         """Check if URL is valid and accessible"""
         if not url or not url.startswith("http"):
             return False
 
         try:
-            response = requests.head(url, timeout=5)
+            response = requests.head(
+                url, timeout=deadline_timeout(deadline, Config.MEDIA_CHECK_TIMEOUT)
+            )
             return response.status_code == 200
         except:
             return False
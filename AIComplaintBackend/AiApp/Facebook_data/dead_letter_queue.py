@@ -0,0 +1,151 @@
+# dead_letter_queue.py - Failed posts with scheduled exponential-backoff retries
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, ReturnDocument
+from config import Config
+from mongo_client import run_once
+
+
+class DeadLetterQueue:
+    def __init__(self, db, collection_name="failed_posts"):
+        self.collection = db[collection_name]
+        self.max_attempts = Config.DLQ_MAX_ATTEMPTS
+        self.base_backoff = Config.DLQ_BASE_BACKOFF_SECONDS
+        self.max_backoff = Config.DLQ_MAX_BACKOFF_SECONDS
+        run_once(collection_name, self.setup_indexes)
+
+    def setup_indexes(self):
+        """Indexes for lookups by post and for the retry scan"""
+        try:
+            self.collection.create_index("post_id", unique=True, background=True)
+            self.collection.create_index(
+                [("status", ASCENDING), ("next_retry_at", ASCENDING)],
+                background=True,
+            )
+        except Exception as e:
+            print(f"⚠️  Dead-letter index note: {e}")
+
+    def _backoff_seconds(self, attempts):
+        """Exponential backoff: base, 2*base, 4*base ... capped"""
+        return min(self.base_backoff * (2 ** (attempts - 1)), self.max_backoff)
+
+    def record_failure(self, post, error, stage="processing"):
+        """Write a failed post with its error class, attempt count and next retry"""
+        post_id = post.get("id")
+        if not post_id:
+            return None
+
+        now = datetime.now()
+        try:
+            entry = self.collection.find_one_and_update(
+                {"post_id": post_id},
+                {
+                    "$inc": {"attempts": 1},
+                    "$set": {
+                        "post": post,
+                        "stage": getattr(error, "stage", stage),
+                        "error_class": type(error).__name__,
+                        "error_message": str(error)[:500],
+                        "last_failed_at": now,
+                    },
+                    "$setOnInsert": {"first_failed_at": now},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+
+            attempts = entry["attempts"]
+            if attempts >= self.max_attempts:
+                update = {"status": "exhausted", "next_retry_at": None}
+                print(f"   ☠️  Post {post_id} exhausted {attempts} attempts")
+            else:
+                next_retry_at = now + timedelta(seconds=self._backoff_seconds(attempts))
+                update = {"status": "pending", "next_retry_at": next_retry_at}
+                print(
+                    f"   📮 Post {post_id} dead-lettered (attempt {attempts}), "
+                    f"retry at {next_retry_at.strftime('%I:%M %p')}"
+                )
+
+            self.collection.update_one({"post_id": post_id}, {"$set": update})
+            return attempts
+
+        except Exception as e:
+            print(f"   ⚠️  Could not dead-letter post {post_id}: {e}")
+            return None
+
+    def blocked_post_ids(self, post_ids):
+        """Post ids the live run should leave to the retry worker"""
+        if not post_ids:
+            return set()
+        try:
+            cursor = self.collection.find(
+                {
+                    "post_id": {"$in": list(post_ids)},
+                    "$or": [
+                        {"status": "exhausted"},
+                        {"status": "pending", "next_retry_at": {"$gt": datetime.now()}},
+                    ],
+                },
+                {"post_id": 1},
+            )
+            return {entry["post_id"] for entry in cursor}
+        except Exception as e:
+            print(f"⚠️  Dead-letter lookup error: {e}")
+            return set()
+
+    def due(self, limit=None):
+        """Pending entries whose retry time has passed, oldest first"""
+        limit = limit or Config.DLQ_RETRY_BATCH_SIZE
+        return list(
+            self.collection.find(
+                {"status": "pending", "next_retry_at": {"$lte": datetime.now()}}
+            )
+            .sort("next_retry_at", ASCENDING)
+            .limit(limit)
+        )
+
+    def resolve(self, post_id):
+        """Remove an entry once its post was processed successfully"""
+        self.collection.delete_one({"post_id": post_id})
+
+    def resolve_many(self, post_ids):
+        """Remove entries for posts the live run processed successfully"""
+        if not post_ids:
+            return
+        try:
+            self.collection.delete_many({"post_id": {"$in": list(post_ids)}})
+        except Exception as e:
+            print(f"⚠️  Dead-letter cleanup error: {e}")
+
+    def drain(self, process_post, limit=None):
+        """Retry due entries with process_post; return the successful results.
+
+        Successful entries are left in place so the caller can resolve them
+        once the results are persisted.
+        """
+        succeeded = []
+        entries = self.due(limit)
+        if not entries:
+            return succeeded
+
+        print(f"\n📮 RETRYING {len(entries)} DEAD-LETTERED POSTS")
+        for entry in entries:
+            post = entry["post"]
+            try:
+                result = process_post(post)
+                if result is None:
+                    # Invalid post - nothing left to retry
+                    self.resolve(entry["post_id"])
+                    continue
+                succeeded.append(result)
+                print(f"   ✅ Retry succeeded: {entry['post_id']}")
+            except Exception as e:
+                self.record_failure(post, e, entry.get("stage", "processing"))
+
+        return succeeded
+
+    def get_summary(self):
+        """Counts per status for monitoring"""
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {
+            doc["_id"]: doc["count"] for doc in self.collection.aggregate(pipeline)
+        }
@@ -0,0 +1,71 @@
+# deadline.py - Time budgets shared by every external call of a post/run
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a required step cannot start because the budget is spent"""
+
+
+class Deadline:
+    def __init__(self, seconds=None, parent=None, label="post"):
+        # seconds=None means "no own limit" (only the parent limit applies)
+        now = time.monotonic()
+        self.label = label
+        self.parent = parent
+        self.expires_at = now + seconds if seconds is not None else None
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+        self.skipped = []
+
+    def child(self, seconds, label="post"):
+        """Create a nested deadline that never outlives this one"""
+        return Deadline(seconds, parent=self, label=label)
+
+    def remaining(self):
+        """Seconds left in the budget (None when unlimited)"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, default, minimum=0.5, step="request"):
+        """Timeout for the next call: the default, capped by what is left.
+
+        Never exceeds the remaining budget; raises DeadlineExceeded when less
+        than ``minimum`` seconds are left, so the call is not started at all.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if remaining < minimum:
+            raise DeadlineExceeded(
+                f"{step}: {self.label} deadline exceeded ({remaining:.1f}s left)"
+            )
+        return min(default, remaining)
+
+    def allows(self, step, min_seconds=0.5):
+        """Check whether an optional step fits; record a skip reason if not"""
+        remaining = self.remaining()
+        if remaining is None or remaining >= min_seconds:
+            return True
+        self.skip(step, f"{self.label} deadline exhausted ({remaining:.1f}s left)")
+        return False
+
+    def require(self, step):
+        """Raise DeadlineExceeded when a mandatory step cannot start"""
+        if self.expired():
+            raise DeadlineExceeded(f"{step}: {self.label} deadline exceeded")
+
+    def skip(self, step, reason):
+        """Record an enrichment that was skipped"""
+        self.skipped.append({"step": step, "reason": reason})
+        print(f"      ⏱️  Skipped {step}: {reason}")
+
+
+def deadline_timeout(deadline, default):
+    """Helper for callers that may not receive a deadline"""
+    return deadline.timeout(default) if deadline else default
@@ -27,3 +27,11 @@ class ErrorHandler:
                     raise
 
         return wrapper
+
+
+class PostProcessingError(Exception):
+    """Raised when a post cannot be fully processed and should be retried later"""
+
+    def __init__(self, message, stage="processing"):
+        super().__init__(message)
+        self.stage = stage
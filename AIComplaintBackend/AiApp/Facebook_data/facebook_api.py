@@ -1,6 +1,15 @@
 import requests
 import time
 from config import Config
+from deadline import deadline_timeout
+
+
+class FacebookAPIError(Exception):
+    """Raised by strict pagination when a page cannot be fetched"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class FacebookAPI:
@@ -10,15 +19,36 @@ class FacebookAPI:
         self.rate_limiter = rate_limiter
         self.logger = logger
 
-    def get_paginated_data(self, url, params):
+    def get_paginated_data(self, url, params, deadline=None):
         """Get all paginated data from Facebook API with rate limiting"""
         all_data = []
+        for page in self.iter_paginated_data(url, params, deadline):
+            all_data.extend(page)
+        return all_data
+
+    def iter_paginated_data(
+        self, url, params, deadline=None, max_pages=10, raise_on_error=False
+    ):
+        """Yield paginated data one page at a time with rate limiting.
+
+        By default a failed page ends the iteration early. With
+        raise_on_error=True (backfill) a non-200 response, a Graph "error"
+        payload or a request exception raises FacebookAPIError instead, so
+        the caller can tell a short window from a failed one.
+        """
         page_count = 0
 
-        while url and page_count < 10:
+        while url and (max_pages is None or page_count < max_pages):
+            if deadline and not deadline.allows(f"facebook_page_{page_count + 1}"):
+                break
+
             try:
                 self.rate_limiter.wait_if_needed("facebook")
-                response = requests.get(url, params=params, timeout=30)
+                response = requests.get(
+                    url,
+                    params=params,
+                    timeout=deadline_timeout(deadline, Config.FACEBOOK_TIMEOUT),
+                )
 
                 self.logger.log_api_call(f"Page {page_count + 1}", response.status_code)
 
@@ -26,6 +56,11 @@ class FacebookAPI:
                     print(
                         f"⚠️  API Error on page {page_count + 1}: {response.status_code}"
                     )
+                    if raise_on_error:
+                        raise FacebookAPIError(
+                            f"HTTP {response.status_code} on page {page_count + 1}",
+                            response.status_code,
+                        )
                     break
 
                 data = response.json()
@@ -33,39 +68,56 @@ class FacebookAPI:
                 if "error" in data:
                     print(f"⚠️  Facebook Error: {data['error']}")
                     self.logger.log_error(data["error"], f"Page {page_count + 1}")
+                    if raise_on_error:
+                        raise FacebookAPIError(
+                            f"Graph error on page {page_count + 1}: {data['error']}",
+                            response.status_code,
+                        )
                     break
 
-                if "data" in data:
-                    all_data.extend(data["data"])
-                    print(
-                        f"📄 Fetched page {page_count + 1}: {len(data['data'])} posts"
-                    )
-
                 url = data.get("paging", {}).get("next")
                 params = {}
                 page_count += 1
 
+                if "data" in data:
+                    print(f"📄 Fetched page {page_count}: {len(data['data'])} posts")
+                    yield data["data"]
+
+            except FacebookAPIError:
+                raise
             except Exception as e:
                 print(f"❌ Error on page {page_count + 1}: {str(e)}")
                 self.logger.log_error(e, f"Page {page_count + 1}")
+                if raise_on_error:
+                    raise FacebookAPIError(
+                        f"Request failed on page {page_count + 1}: {e}"
+                    ) from e
                 break
 
-        return all_data
-
-    def get_tagged_mentions(self, since_time):
-        """Get tagged mentions from Facebook"""
-        params_common = {
+    def _tagged_request(self, since_time, until_time=None):
+        """URL and params for the tagged mentions edge"""
+        params = {
             "access_token": self.access_token,
             "limit": 100,
             "since": since_time,
+            "fields": "id,message,from,created_time,permalink_url,full_picture,picture",
         }
+        if until_time:
+            params["until"] = until_time
 
         tagged_url = f"https://graph.facebook.com/v23.0/{self.page_id}/tagged"
+        return tagged_url, params
+
+    def get_tagged_mentions(self, since_time, deadline=None):
+        """Get tagged mentions from Facebook"""
+        tagged_url, params = self._tagged_request(since_time)
+        return self.get_paginated_data(tagged_url, params, deadline)
 
-        return self.get_paginated_data(
-            tagged_url,
-            {
-                **params_common,
-                "fields": "id,message,from,created_time,permalink_url,full_picture,picture",
-            },
+    def iter_tagged_mentions(
+        self, since_time, until_time, max_pages=None, raise_on_error=False
+    ):
+        """Stream tagged mentions in [since_time, until_time) page by page"""
+        tagged_url, params = self._tagged_request(since_time, until_time)
+        return self.iter_paginated_data(
+            tagged_url, params, max_pages=max_pages, raise_on_error=raise_on_error
         )
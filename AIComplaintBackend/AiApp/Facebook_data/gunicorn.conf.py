@@ -0,0 +1,25 @@
+# gunicorn.conf.py - Production settings for the dashboard API
+# Start with: gunicorn dashboard_server:application
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Threaded workers: a slow /api/complaints request only occupies one thread,
+# so other dashboard users and the /health probe keep being served
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", min(4, multiprocessing.cpu_count() * 2)))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+# Each open /api/stream client holds one of these threads; Config.SSE_MAX_CLIENTS
+# (default 4) caps that per worker so the rest keep serving normal requests
+
+# HTTP/1.1 keep-alive between requests on the same connection
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+
+# Each worker opens its own MongoClient after fork (see mongo_client.py)
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
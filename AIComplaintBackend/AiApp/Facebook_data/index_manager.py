@@ -0,0 +1,158 @@
+# index_manager.py - Managed index set and query-shape advisor for complaints
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# Server-side triage order of /api/complaints; the *_triage indexes below
+# put it right after the equality filter
+PAGE_SORT = [("triage_rank", -1), ("_id", -1)]
+
+# Compound indexes follow equality -> sort -> range for the dashboard shapes
+COMPLAINT_INDEXES = [
+    IndexModel([("facebook_post_id", ASCENDING)], name="facebook_post_id_1", unique=True),
+    # Equality filter first, then triage_rank/_id: the server-side triage sort
+    # and keyset pages become bounded index range scans
+    IndexModel(
+        [("status", ASCENDING), ("triage_rank", DESCENDING), ("_id", DESCENDING)],
+        name="status_triage",
+    ),
+    IndexModel(
+        [("department", ASCENDING), ("triage_rank", DESCENDING), ("_id", DESCENDING)],
+        name="department_triage",
+    ),
+    IndexModel(
+        [
+            ("ai_analysis.urgency_level", ASCENDING),
+            ("triage_rank", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        name="urgency_triage",
+    ),
+    # Also serves the priority_score sort of recent_complaints (prefix scan)
+    IndexModel(
+        [("priority_score", ASCENDING), ("triage_rank", DESCENDING), ("_id", DESCENDING)],
+        name="priority_triage",
+    ),
+    IndexModel([("triage_rank", DESCENDING), ("_id", DESCENDING)], name="triage"),
+    IndexModel([("created_at", DESCENDING)], name="created_at"),
+    IndexModel([("location_data.location", ASCENDING)], name="location"),
+    # Delta sync: /api/complaints/changes reads change_seq > token in order
+    IndexModel([("change_seq", ASCENDING)], name="change_seq"),
+]
+
+def query_shapes():
+    """Known dashboard query shapes: name -> (filter, sort).
+
+    The filter_* shapes are /api/complaints requests, which are always
+    served in PAGE_SORT order, so they are explained with that sort.
+    """
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    return {
+        "recent_complaints": (
+            {"created_at": {"$gte": week_ago}},
+            [("priority_score", -1)],
+        ),
+        "triage_page": ({}, PAGE_SORT),
+        "changes_since": ({"change_seq": {"$gt": 0}}, [("change_seq", 1)]),
+        "filter_status": ({"status": "pending_review"}, PAGE_SORT),
+        "filter_department": ({"department": "IT Department"}, PAGE_SORT),
+        "filter_priority": ({"priority_score": 5}, PAGE_SORT),
+        "filter_urgency": ({"ai_analysis.urgency_level": "high"}, PAGE_SORT),
+        "filter_status_week": (
+            {"status": "pending_review", "created_at": {"$gte": week_ago}},
+            PAGE_SORT,
+        ),
+        "filter_department_week": (
+            {"department": "IT Department", "created_at": {"$gte": week_ago}},
+            PAGE_SORT,
+        ),
+        "filter_week": ({"created_at": {"$gte": week_ago}}, PAGE_SORT),
+        "filter_location_identified": (
+            {"location_data": {"$exists": True, "$ne": None}},
+            PAGE_SORT,
+        ),
+    }
+
+
+class ComplaintIndexManager:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def ensure_indexes(self):
+        """Create any missing managed index; safe to call on every startup"""
+        existing = self.collection.index_information()
+        missing = [
+            model for model in COMPLAINT_INDEXES if model.document["name"] not in existing
+        ]
+        if missing:
+            created = self.collection.create_indexes(missing)
+            print(f"✅ Created indexes: {', '.join(created)}")
+
+        managed = {model.document["name"] for model in COMPLAINT_INDEXES} | {"_id_"}
+        unmanaged = sorted(set(existing) - managed)
+        if unmanaged:
+            print(f"ℹ️  Unmanaged indexes present: {', '.join(unmanaged)}")
+        return len(missing)
+
+    @staticmethod
+    def _plan_stages(plan):
+        """Flatten a winning plan tree into (stage, index name) pairs"""
+        stages = [(plan.get("stage"), plan.get("indexName"))]
+        for key in ("inputStage", "queryPlan"):
+            if key in plan:
+                stages.extend(ComplaintIndexManager._plan_stages(plan[key]))
+        for child in plan.get("inputStages", []):
+            stages.extend(ComplaintIndexManager._plan_stages(child))
+        return stages
+
+    def explain_shape(self, query, sort=None):
+        """Winning plan summary for one query shape"""
+        cursor = self.collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = cursor.explain()
+
+        winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+        stages = self._plan_stages(winning_plan)
+        execution = explanation.get("executionStats", {})
+        return {
+            "collection_scan": any(stage == "COLLSCAN" for stage, _ in stages),
+            "in_memory_sort": any(stage == "SORT" for stage, _ in stages),
+            "indexes": sorted({index for _, index in stages if index}),
+            "keys_examined": execution.get("totalKeysExamined"),
+            "docs_examined": execution.get("totalDocsExamined"),
+            "returned": execution.get("nReturned"),
+        }
+
+    def advise(self):
+        """Explain every known shape and flag collection scans"""
+        report = {}
+        for name, (query, sort) in query_shapes().items():
+            try:
+                report[name] = self.explain_shape(query, sort)
+            except Exception as e:
+                report[name] = {"error": str(e)}
+        return report
+
+
+if __name__ == "__main__":
+    from mongodb_data_service import MongoDBComplaintService
+
+    service = MongoDBComplaintService()
+    manager = ComplaintIndexManager(service.complaints_collection)
+
+    print("🔎 QUERY SHAPE ADVISOR")
+    problems = 0
+    for name, result in manager.advise().items():
+        if "error" in result:
+            print(f"   ❌ {name}: {result['error']}")
+            problems += 1
+        elif result["collection_scan"]:
+            print(f"   ⚠️  {name}: COLLECTION SCAN")
+            problems += 1
+        else:
+            sort_note = " + in-memory sort" if result["in_memory_sort"] else ""
+            print(
+                f"   ✅ {name}: {', '.join(result['indexes'])}{sort_note} "
+                f"(keys {result['keys_examined']}, docs {result['docs_examined']})"
+            )
+    print(f"🏁 {problems} shapes need attention")
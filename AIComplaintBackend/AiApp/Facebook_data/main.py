@@ -1,8 +1,10 @@
 # main.py - Optimized Complete Integration with Single Data Processing
+import heapq
+import re
 import time
 from datetime import datetime
 from config import Config
-from error_handler import ErrorHandler
+from error_handler import ErrorHandler, PostProcessingError
 from rate_limiter import RateLimiter
 from logger import Logger
 from data_validator import DataValidator
@@ -14,13 +16,51 @@ from data_processor import DataProcessor
 from file_manager import FileManager
 from display_manager import DisplayManager
 from mongodb_data_service import MongoDBComplaintService
+from deadline import Deadline, DeadlineExceeded
+from run_checkpoint import RunCheckpoint
+from dead_letter_queue import DeadLetterQueue
+
+# Keyword sets shared by priority scoring, complaint confidence and the
+# pre-analysis urgency ordering
+URGENT_WORDS = ["urgent", "emergency", "immediate", "critical", "serious"]
+COMPLAINT_KEYWORDS = [
+    "bad",
+    "poor",
+    "broken",
+    "not working",
+    "issue",
+    "problem",
+    "complain",
+]
+URGENT_WORD_WEIGHT = 10
+COMPLAINT_KEYWORD_WEIGHT = 3
+
+# One alternation so a message is scanned once for both keyword sets
+_URGENCY_PATTERN = re.compile(
+    "|".join(
+        re.escape(word)
+        for word in sorted(URGENT_WORDS + COMPLAINT_KEYWORDS, key=len, reverse=True)
+    ),
+    re.IGNORECASE,
+)
+
+
+def urgency_score(message):
+    """Cheap local urgency estimate used to order posts before AI analysis"""
+    if not message:
+        return 0
+    matched = {match.group().lower() for match in _URGENCY_PATTERN.finditer(message)}
+    return sum(
+        URGENT_WORD_WEIGHT if word in URGENT_WORDS else COMPLAINT_KEYWORD_WEIGHT
+        for word in matched
+    )
 
 
 class FacebookMentionsAnalyzer:
-    def __init__(self):
+    def __init__(self, rate_limiter=None, job_name="main"):
         # Initialize all components
         self.error_handler = ErrorHandler()
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter or RateLimiter()
         self.logger = Logger()
         self.validator = DataValidator()
         self.web_scraper = WebScraper()
@@ -37,11 +77,15 @@ class FacebookMentionsAnalyzer:
         self.file_manager = FileManager()
         self.display_manager = DisplayManager()
         self.mongodb_service = MongoDBComplaintService()
+        self.dead_letter_queue = DeadLetterQueue(self.mongodb_service.db)
 
         # Cache for processed data to avoid reprocessing
         self.processed_posts_cache = None
         self.cache_timestamp = None
 
+        # Per-post journal of the current run (resumed after a crash)
+        self.checkpoint = RunCheckpoint(job_name)
+
         # Validate configuration
         if not self._validate_configuration():
             raise ValueError("Configuration validation failed")
@@ -91,6 +135,9 @@ class FacebookMentionsAnalyzer:
 
         since_time = current_time - total_seconds
 
+        # Per-run budget; each post gets its own budget nested inside it
+        run_deadline = Deadline(Config.RUN_DEADLINE_SECONDS, label="run")
+
         # Display search information
         print(f"🚀 OPTIMIZED FACEBOOK MENTIONS & AI ANALYSIS")
         print(f"🔍 From: {time.ctime(since_time)}")
@@ -99,7 +146,7 @@ class FacebookMentionsAnalyzer:
 
         # Fetch data from Facebook API
         try:
-            posts = self.facebook_api.get_tagged_mentions(since_time)
+            posts = self.facebook_api.get_tagged_mentions(since_time, run_deadline)
 
             if not posts:
                 print("⚠️  No posts found")
@@ -107,11 +154,22 @@ class FacebookMentionsAnalyzer:
 
             print(f"✅ SUCCESS! Found {len(posts)} posts")
 
+            # Posts waiting on a dead-letter backoff are left to the retry worker
+            blocked = self.dead_letter_queue.blocked_post_ids(
+                [post.get("id") for post in posts]
+            )
+            if blocked:
+                posts = [post for post in posts if post.get("id") not in blocked]
+                print(f"📮 {len(blocked)} posts deferred to dead-letter retries")
+
         except Exception as e:
             print(f"❌ API call failed: {str(e)}")
             self.logger.log_error(e, "Facebook API")
             return []
 
+        # Open (or resume) the run journal before any AI work
+        self.checkpoint.start()
+
         # Process all posts ONCE with enhanced AI analysis
         print(f"\n🤖 ENHANCED AI ANALYSIS PROCESSING:")
         print(f"📊 Processing {len(posts)} posts with full AI pipeline...")
@@ -121,12 +179,28 @@ class FacebookMentionsAnalyzer:
         non_complaints_count = 0
         locations_detected = 0
 
-        for i, post in enumerate(posts, 1):
+        # Likely-urgent complaints are classified, analyzed and saved first
+        queue = self._build_urgency_queue(posts)
+
+        i = 0
+        while queue:
+            if run_deadline.expired():
+                print(
+                    f"   ⏱️  Run deadline reached - {len(queue)} posts left for next run"
+                )
+                break
+
+            _, _, post = heapq.heappop(queue)
+            i += 1
+
             print(f"   🔄 Processing post {i}/{len(posts)} - Enhanced AI analysis...")
 
             try:
                 # Single comprehensive processing with enhanced features
-                processed_post = self._enhanced_single_post_processing(post)
+                post_deadline = run_deadline.child(Config.POST_DEADLINE_SECONDS)
+                processed_post = self._enhanced_single_post_processing(
+                    post, post_deadline, self.checkpoint
+                )
 
                 if processed_post:
                     processed_posts.append(processed_post)
@@ -139,9 +213,19 @@ class FacebookMentionsAnalyzer:
                     else:
                         non_complaints_count += 1
 
+            except DeadlineExceeded as e:
+                print(f"   ⏱️  Post {i} skipped: {e}")
+                self.logger.log_error(e, f"Post deadline {i}")
+                self.dead_letter_queue.record_failure(post, e, "deadline")
             except Exception as e:
                 print(f"   ❌ Error processing post {i}: {e}")
                 self.logger.log_error(e, f"Post processing {i}")
+                self.dead_letter_queue.record_failure(post, e)
+
+        # Posts that succeeded no longer need their dead-letter entries
+        self.dead_letter_queue.resolve_many(
+            [post["post_id"] for post in processed_posts]
+        )
 
         # Cache the processed data
         self.processed_posts_cache = processed_posts
@@ -157,29 +241,58 @@ class FacebookMentionsAnalyzer:
 
         return processed_posts
 
-    def _enhanced_single_post_processing(self, post):
+    def _build_urgency_queue(self, posts):
+        """Priority queue of posts, highest local urgency score first"""
+        queue = []
+        for index, post in enumerate(posts):
+            score = urgency_score(post.get("message", ""))
+            # index keeps API order among equal scores and avoids comparing dicts
+            queue.append((-score, index, post))
+        heapq.heapify(queue)
+
+        urgent = sum(1 for entry in queue if -entry[0] >= URGENT_WORD_WEIGHT)
+        if urgent:
+            print(f"🚨 {urgent} posts with urgency keywords moved to the front")
+        return queue
+
+    def process_post(self, post, deadline=None):
+        """Process one post outside the scheduled run (retries, backfill)"""
+        return self._enhanced_single_post_processing(
+            post, deadline or Deadline(Config.POST_DEADLINE_SECONDS)
+        )
+
+    def _enhanced_single_post_processing(self, post, deadline=None, checkpoint=None):
         """Enhanced single post processing with comprehensive AI analysis"""
 
         if not self.validator.validate_post_data(post):
             return None
 
-        # Extract username with enhanced validation
+        post_id = post.get("id")
+        if checkpoint and checkpoint.has(post_id, "processed"):
+            print(f"      ♻️  Restored from checkpoint: {post_id}")
+            return checkpoint.get(post_id, "processed")
+
+        deadline = deadline or Deadline(Config.POST_DEADLINE_SECONDS)
+
+        # Extract username with enhanced validation (optional enrichment)
         username = "Unknown"
-        if "permalink_url" in post:
-            username = self.web_scraper.get_user_name(post.get("permalink_url"))
-            if username in ["Unknown", "Name not found", "Error extracting name"]:
-                # Try alternative extraction methods
-                username = post.get("from", {}).get("name", "Unknown")
+        if "permalink_url" in post and deadline.allows("permalink_username"):
+            username = self.web_scraper.get_user_name(
+                post.get("permalink_url"), deadline
+            )
+        if username in ["Unknown", "Name not found", "Error extracting name"]:
+            # Try alternative extraction methods
+            username = post.get("from", {}).get("name", "Unknown")
 
         # Enhanced media processing
         media = self.media_processor.extract_media_from_post(post)
-        if "permalink_url" in post:
+        if "permalink_url" in post and deadline.allows("permalink_media"):
             scraped_media = self.web_scraper.get_media_from_permalink(
-                post.get("permalink_url")
+                post.get("permalink_url"), deadline
             )
             media = self.media_processor.merge_scraped_media(media, scraped_media)
 
-        media = self.validator.validate_media_urls(media)
+        media = self.validator.validate_media_urls(media, deadline)
         media_count = self.media_processor.count_media_items(media)
 
         # Enhanced message cleaning and validation
@@ -197,9 +310,20 @@ class FacebookMentionsAnalyzer:
             print(f"      🔍 Enhanced AI analysis: '{cleaned_message[:50]}...'")
 
             # Enhanced complaint detection with confidence scoring
-            is_complaint, confidence = self._enhanced_complaint_detection(
-                cleaned_message
-            )
+            if checkpoint and checkpoint.has(post_id, "classified"):
+                classified = checkpoint.get(post_id, "classified")
+                is_complaint = classified["is_complaint"]
+                confidence = classified["confidence"]
+            else:
+                is_complaint, confidence = self._enhanced_complaint_detection(
+                    cleaned_message, deadline
+                )
+                if checkpoint:
+                    checkpoint.record(
+                        post_id,
+                        "classified",
+                        {"is_complaint": is_complaint, "confidence": confidence},
+                    )
 
             if is_complaint:
                 print(
@@ -209,9 +333,14 @@ class FacebookMentionsAnalyzer:
                 complaint_info["confidence_score"] = confidence
 
                 # Comprehensive AI analysis
-                analysis_result = self._comprehensive_complaint_analysis(
-                    cleaned_message
-                )
+                if checkpoint and checkpoint.has(post_id, "analyzed"):
+                    analysis_result = checkpoint.get(post_id, "analyzed")
+                else:
+                    analysis_result = self._comprehensive_complaint_analysis(
+                        cleaned_message, deadline
+                    )
+                    if checkpoint and analysis_result:
+                        checkpoint.record(post_id, "analyzed", analysis_result)
 
                 if analysis_result:
                     complaint_info["analysis"] = analysis_result
@@ -226,6 +355,9 @@ class FacebookMentionsAnalyzer:
                     self.logger.log_complaint_analysis(post.get("id"), True, priority)
                 else:
                     print(f"      ❌ Failed to complete enhanced analysis")
+                    raise PostProcessingError(
+                        "Complaint analysis returned no result", stage="analysis"
+                    )
             else:
                 print(f"      ℹ️  Not a complaint (Confidence: {confidence}%)")
                 self.logger.log_complaint_analysis(post.get("id"), False)
@@ -253,16 +385,20 @@ class FacebookMentionsAnalyzer:
                 "processed_at": datetime.now().isoformat(),
                 "ai_version": "enhanced_pipeline_v2",
                 "confidence_score": complaint_info.get("confidence_score", 0),
+                "skipped_enrichments": deadline.skipped,
             },
         }
 
+        if checkpoint:
+            checkpoint.record(post_id, "processed", post_data)
+
         return post_data
 
-    def _enhanced_complaint_detection(self, message):
+    def _enhanced_complaint_detection(self, message, deadline=None):
         """Enhanced complaint detection with confidence scoring"""
         try:
             # Use existing AI analyzer with enhanced confidence
-            is_complaint = self.ai_analyzer.is_complaint(message)
+            is_complaint = self.ai_analyzer.is_complaint(message, deadline)
 
             # Calculate confidence based on multiple factors
             confidence = 0
@@ -272,18 +408,9 @@ class FacebookMentionsAnalyzer:
                 confidence = 75
 
                 # Enhance confidence based on keywords
-                complaint_keywords = [
-                    "bad",
-                    "poor",
-                    "broken",
-                    "not working",
-                    "issue",
-                    "problem",
-                    "complain",
-                ]
                 location_keywords = ["in", "at", "near", "around"]
 
-                for keyword in complaint_keywords:
+                for keyword in COMPLAINT_KEYWORDS:
                     if keyword.lower() in message.lower():
                         confidence += 5
 
@@ -299,15 +426,19 @@ class FacebookMentionsAnalyzer:
 
             return is_complaint, confidence
 
+        except (DeadlineExceeded, PostProcessingError):
+            raise
         except Exception as e:
             print(f"      ⚠️  Enhanced detection error: {e}")
             return False, 0
 
-    def _comprehensive_complaint_analysis(self, message):
+    def _comprehensive_complaint_analysis(self, message, deadline=None):
         """Comprehensive AI analysis with enhanced features"""
         try:
             # Use existing analyzer but with enhanced error handling
-            analysis_result = self.ai_analyzer.analyze_complaint_with_location(message)
+            analysis_result = self.ai_analyzer.analyze_complaint_with_location(
+                message, deadline
+            )
 
             if analysis_result:
                 # Enhance the analysis with additional metadata
@@ -329,6 +460,8 @@ class FacebookMentionsAnalyzer:
 
             return analysis_result
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"      ❌ Comprehensive analysis error: {e}")
             return None
@@ -344,8 +477,7 @@ class FacebookMentionsAnalyzer:
         enhanced_priority = original_priority
 
         # Urgency indicators
-        urgent_words = ["urgent", "emergency", "immediate", "critical", "serious"]
-        for word in urgent_words:
+        for word in URGENT_WORDS:
             if word.lower() in message.lower():
                 enhanced_priority = min(enhanced_priority + 1, 5)
                 break
@@ -452,11 +584,25 @@ class FacebookMentionsAnalyzer:
             print(f"❌ MongoDB complaints save error: {e}")
             results["mongodb_complaints"] = None
 
+        # Outputs are persisted - the run journal is no longer needed
+        if results["mongodb_all"] is not None:
+            self.checkpoint.complete()
+
         # Final comprehensive summary
         self._display_comprehensive_summary(results, processed_posts)
 
         return results
 
+    def retry_dead_letters(self, limit=None):
+        """Drain due dead-letter entries and persist the posts that now succeed"""
+        recovered = self.dead_letter_queue.drain(self.process_post, limit)
+        if recovered:
+            self.mongodb_service.save_complaints_only(recovered)
+            self.dead_letter_queue.resolve_many(
+                [post["post_id"] for post in recovered]
+            )
+        return recovered
+
     def _save_json_outputs(self, complaints, non_complaints):
         """Save JSON outputs efficiently"""
         # Prepare complaints data
@@ -630,9 +776,9 @@ class FacebookMentionsAnalyzer:
         print(f"   🎯 Ready for government dashboard display")
 
 
-def main():
+def main(job_name="main"):
     try:
-        analyzer = FacebookMentionsAnalyzer()
+        analyzer = FacebookMentionsAnalyzer(job_name=job_name)
 
         print("🚀 Starting OPTIMIZED Facebook Mentions Analysis System")
         print("🎯 Single processing for maximum efficiency")
@@ -641,6 +787,9 @@ def main():
         # Run the optimized analysis
         results = analyzer.save_all_outputs_efficiently(days=5)
 
+        # Retry previously failed posts whose backoff has elapsed
+        analyzer.retry_dead_letters()
+
         if results:
             print(f"\n🎉 SYSTEM ANALYSIS COMPLETED SUCCESSFULLY!")
             print(
@@ -0,0 +1,131 @@
+# mongo_client.py - Process-wide shared MongoClient with lazy connection
+import os
+import threading
+import time
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+try:
+    from config import Config
+    from mongo_monitor import command_monitor
+except ImportError:  # imported as a package module (e.g. from AiApp/db.py)
+    from .config import Config
+    from .mongo_monitor import command_monitor
+
+_lock = threading.RLock()
+_client = None
+_client_pid = None
+_initialized = set()
+
+
+def get_client():
+    """Return this process's MongoClient, creating it on first use.
+
+    The client is created with connect=False so nothing touches the network
+    until the first operation, and it is recreated after a fork (gunicorn
+    pre-fork workers) because MongoClient instances are not fork-safe.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            listeners = [command_monitor] if Config.MONGO_COMMAND_MONITORING else []
+            _client = MongoClient(
+                Config.MONGODB_URI,
+                maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=Config.MONGODB_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=Config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=listeners,
+                connect=False,
+            )
+            _client_pid = pid
+    return _client
+
+
+def get_database(name=None):
+    """Database handle on the shared client"""
+    return get_client()[name or Config.MONGODB_DATABASE]
+
+
+def run_once(key, setup):
+    """Run a setup callable (collection/index creation) once per process"""
+    if key in _initialized:
+        return
+    with _lock:
+        if key in _initialized:
+            return
+        setup()
+        _initialized.add(key)
+
+
+def reserve_sequence(db, counter_id, count=1, pending=False):
+    """First of count consecutive numbers from a counter in the meta collection.
+
+    With pending=True the reservation is also recorded on the counter until
+    release_sequence(), in the same atomic update, so committed_sequence()
+    never reports a number whose write may still be in flight.
+    """
+    if not pending:
+        counter = db["meta"].find_one_and_update(
+            {"_id": counter_id},
+            {"$inc": {"value": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return counter["value"] - count + 1
+
+    # Compare-and-set, so the pending entry can name its first number
+    meta = db["meta"]
+    while True:
+        counter = meta.find_one({"_id": counter_id}, {"value": 1})
+        entry = {"at": time.time()}
+        if counter is None:
+            entry["first"] = 1
+            try:
+                meta.insert_one({"_id": counter_id, "value": count, "pending": [entry]})
+                return 1
+            except DuplicateKeyError:
+                continue
+
+        entry["first"] = counter["value"] + 1
+        result = meta.update_one(
+            {"_id": counter_id, "value": counter["value"]},
+            {"$inc": {"value": count}, "$push": {"pending": entry}},
+        )
+        if result.modified_count:
+            return entry["first"]
+
+
+def release_sequence(db, counter_id, first, pending_timeout):
+    """End a pending reservation once its write has returned (or failed)"""
+    meta = db["meta"]
+    meta.update_one({"_id": counter_id}, {"$pull": {"pending": {"first": first}}})
+    # Drop reservations left behind by writers that died mid-write
+    expired = time.time() - pending_timeout
+    meta.update_one(
+        {"_id": counter_id, "pending.at": {"$lt": expired}},
+        {"$pull": {"pending": {"at": {"$lt": expired}}}},
+    )
+
+
+def committed_sequence(db, counter_id, pending_timeout):
+    """Highest number n such that no reservation <= n is still pending.
+
+    Every write stamped with a number up to n has returned before this
+    read, so a reader that queries after calling it sees all of them.
+    Reservations older than pending_timeout seconds are ignored.
+    """
+    counter = db["meta"].find_one({"_id": counter_id})
+    if counter is None:
+        return 0
+    expired = time.time() - pending_timeout
+    pending = [
+        entry["first"]
+        for entry in counter.get("pending", [])
+        if entry["at"] >= expired
+    ]
+    return min(pending) - 1 if pending else counter["value"]
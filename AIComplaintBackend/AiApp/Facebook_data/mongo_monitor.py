@@ -0,0 +1,262 @@
+# mongo_monitor.py - pymongo command monitoring, per-shape latency histograms
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from pymongo import monitoring
+
+try:
+    from config import Config
+except ImportError:  # imported as a package module (e.g. from AiApp/db.py)
+    from .config import Config
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf")]
+
+# Handshake/auth/session chatter, not application queries
+IGNORED_COMMANDS = {
+    "hello",
+    "ismaster",
+    "isMaster",
+    "ping",
+    "buildinfo",
+    "buildInfo",
+    "saslStart",
+    "saslContinue",
+    "authenticate",
+    "endSessions",
+    "killCursors",
+}
+
+# Commands whose first value is the collection name
+COLLECTION_COMMANDS = {
+    "find",
+    "aggregate",
+    "count",
+    "distinct",
+    "insert",
+    "update",
+    "delete",
+    "findAndModify",
+    "createIndexes",
+    "listIndexes",
+}
+
+
+def is_await_get_more(command_name, command):
+    """getMore on a tailable awaitData cursor (the /api/stream event log).
+
+    It blocks until new data arrives or maxTimeMS (the idle heartbeat)
+    passes, so its duration is wait time, not query latency. pymongo only
+    sends maxTimeMS on getMore for such cursors.
+    """
+    return command_name == "getMore" and "maxTimeMS" in command
+
+
+def normalize_shape(value):
+    """Replace literal values with "?" but keep field names and operators"""
+    if isinstance(value, dict):
+        return {key: normalize_shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            return [normalize_shape(item) for item in value]
+        return "?"
+    return "?"
+
+
+def _pipeline_shape(pipeline):
+    """Stage names, with the shape of a leading $match"""
+    stages = []
+    for stage in pipeline:
+        name = next(iter(stage), "?")
+        if name == "$match":
+            stages.append({"$match": normalize_shape(stage[name])})
+        else:
+            stages.append(name)
+    return stages
+
+
+def command_shape(command_name, command):
+    """(collection, normalized shape) for a command document"""
+    collection = None
+    if command_name in COLLECTION_COMMANDS:
+        collection = command.get(command_name)
+    elif command_name == "getMore":
+        collection = command.get("collection")
+
+    if command_name == "find":
+        shape = {"filter": normalize_shape(command.get("filter", {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+    elif command_name == "aggregate":
+        shape = {"pipeline": _pipeline_shape(command.get("pipeline", []))}
+    elif command_name == "count":
+        shape = {"query": normalize_shape(command.get("query", {}))}
+    elif command_name == "distinct":
+        shape = {
+            "key": command.get("key"),
+            "query": normalize_shape(command.get("query", {})),
+        }
+    elif command_name == "update":
+        updates = command.get("updates", [])
+        shape = {"q": normalize_shape(updates[0].get("q", {})) if updates else {}}
+    elif command_name == "delete":
+        deletes = command.get("deletes", [])
+        shape = {"q": normalize_shape(deletes[0].get("q", {})) if deletes else {}}
+    elif command_name == "findAndModify":
+        shape = {"query": normalize_shape(command.get("query", {}))}
+    else:
+        shape = {}
+
+    return collection, json.dumps(shape, sort_keys=True, default=str)
+
+
+class _ShapeStats:
+    __slots__ = ("count", "failures", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def add(self, duration_ms, failed):
+        self.count += 1
+        self.failures += 1 if failed else 0
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[index] += 1
+                break
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls"""
+        target = self.count * fraction
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += hits
+            if seen >= target:
+                return bound if bound != float("inf") else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Records every MongoDB command by (command, collection, query shape).
+
+    Commands slower than MONGO_SLOW_QUERY_MS are also written as JSON lines
+    to the slow-query log.
+    """
+
+    def __init__(self, slow_query_ms=None):
+        self.slow_query_ms = (
+            slow_query_ms if slow_query_ms is not None else Config.MONGO_SLOW_QUERY_MS
+        )
+        self.started_at = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._stats = {}
+        self._slow_log = None
+
+    def _slow_logger(self):
+        if self._slow_log is None:
+            logger = logging.getLogger("mongo_slow_queries")
+            logger.setLevel(logging.WARNING)
+            logger.propagate = False
+            if not logger.handlers:
+                os.makedirs("logs", exist_ok=True)
+                handler = logging.FileHandler(Config.MONGO_SLOW_QUERY_LOG)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+            self._slow_log = logger
+        return self._slow_log
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS or is_await_get_more(
+            event.command_name, event.command
+        ):
+            return
+        collection, shape = command_shape(event.command_name, event.command)
+        with self._lock:
+            self._inflight[(event.request_id, event.connection_id)] = (
+                event.command_name,
+                collection,
+                shape,
+            )
+
+    def _finished(self, event, failed):
+        with self._lock:
+            details = self._inflight.pop((event.request_id, event.connection_id), None)
+        if details is None:
+            return
+
+        command_name, collection, shape = details
+        duration_ms = event.duration_micros / 1000.0
+        key = (command_name, collection, shape)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _ShapeStats()
+            stats.add(duration_ms, failed)
+
+        if duration_ms >= self.slow_query_ms:
+            self._slow_logger().warning(
+                json.dumps(
+                    {
+                        "ts": datetime.now(timezone.utc).isoformat(),
+                        "command": command_name,
+                        "collection": collection,
+                        "shape": json.loads(shape),
+                        "duration_ms": round(duration_ms, 1),
+                        "failed": failed,
+                    }
+                )
+            )
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    def snapshot(self, limit=None):
+        """Per-shape stats, slowest total time first"""
+        shapes = []
+        with self._lock:
+            for (command_name, collection, shape), stats in self._stats.items():
+                shapes.append(
+                    {
+                        "command": command_name,
+                        "collection": collection,
+                        "shape": json.loads(shape),
+                        "count": stats.count,
+                        "failures": stats.failures,
+                        "total_ms": round(stats.total_ms, 1),
+                        "avg_ms": round(stats.total_ms / stats.count, 2),
+                        "max_ms": round(stats.max_ms, 1),
+                        "p50_ms": stats.percentile(0.5),
+                        "p95_ms": stats.percentile(0.95),
+                        "histogram": {
+                            ("inf" if bound == float("inf") else f"le_{bound}"): hits
+                            for bound, hits in zip(LATENCY_BUCKETS_MS, stats.buckets)
+                        },
+                    }
+                )
+
+        shapes.sort(key=lambda shape: shape["total_ms"], reverse=True)
+        return {
+            "since": self.started_at.isoformat(),
+            "slow_query_ms": self.slow_query_ms,
+            "shapes": shapes[:limit] if limit else shapes,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+        self.started_at = datetime.now(timezone.utc)
+
+
+# Process-wide monitor registered on the shared MongoClient
+command_monitor = CommandMonitor()
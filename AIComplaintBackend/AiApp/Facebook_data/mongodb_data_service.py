@@ -1,111 +1,756 @@
 # mongodb_data_service.py - Enhanced with comprehensive statistics
-import os
-from pymongo import MongoClient
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-
-load_dotenv()
+import base64
+import hashlib
+import json
+from contextlib import contextmanager
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta, timezone
+from config import Config
+from mongo_client import (
+    committed_sequence,
+    get_client,
+    get_database,
+    release_sequence,
+    reserve_sequence,
+    run_once,
+)
+from index_manager import PAGE_SORT, ComplaintIndexManager
+from stats_rollup import ComplaintStatsRollup, ROLLUP_PROJECTION
+from complaint_events import ComplaintEventLog
+from complaint_formatter import STATUS_DISPLAY, URGENCY_WEIGHTS, compute_display
+
+# Owned by officers after insert; the pipeline only sets their initial value
+OPERATOR_FIELDS = {"status": "pending_review"}
+
+# Restamped on every run, or derived from the other fields at write time
+# ("display"), so they never count as a content change
+VOLATILE_FIELDS = ("processing_timestamp", "last_updated", "display")
+
+# Pre-image fields needed for change detection and the stats rollup
+PREVIOUS_PROJECTION = {**ROLLUP_PROJECTION, "content_fingerprint": 1}
+
+# Named find() projections per consumer; None means the whole document
+COMPLAINT_PROJECTIONS = {
+    # Dashboard feed card: identity, text, triage fields and media links only
+    "list": {
+        "facebook_post_id": 1,
+        "profile_name": 1,
+        "complaint_query": 1,
+        "created_at": 1,
+        "date": 1,
+        "time": 1,
+        "priority_score": 1,
+        "department": 1,
+        "recommended_officer": 1,
+        "status": 1,
+        "ai_analysis.urgency_level": 1,
+        "ai_analysis.sentiment": 1,
+        "ai_analysis.category": 1,
+        "ai_analysis.summary": 1,
+        "ai_analysis.suggested_actions": 1,
+        "location_data.location": 1,
+        "location_data.type": 1,
+        "location_data.confidence": 1,
+        "location_data.method": 1,
+        "facebook_permalink": 1,
+        "image_link": 1,
+        "video_link": 1,
+        "processing_timestamp": 1,
+        "last_updated": 1,
+        "triage_rank": 1,
+        "display": 1,
+    },
+    "detail": None,
+    # Flat reporting columns
+    "export": {
+        "facebook_post_id": 1,
+        "created_at": 1,
+        "profile_name": 1,
+        "complaint_query": 1,
+        "department": 1,
+        "priority_score": 1,
+        "status": 1,
+        "ai_analysis.urgency_level": 1,
+        "ai_analysis.category": 1,
+        "location_data.location": 1,
+        "facebook_permalink": 1,
+        "triage_rank": 1,
+    },
+}
+
+# meta counter behind change_seq, stamped on every complaint write
+CHANGE_SEQ_COUNTER = "complaints_change_seq"
+
+
+def triage_rank(priority_score, urgency_level, created_at):
+    """Single sortable number: priority, then urgency, then newest first.
+
+    (priority * 4 + urgency weight) selects a band 10^10 wide and the
+    creation time in epoch seconds orders complaints inside the band.
+    """
+    band = (priority_score or 1) * 4 + URGENCY_WEIGHTS.get(
+        (urgency_level or "").lower(), 0
+    )
+    if created_at.tzinfo is None:  # naive datetimes from MongoDB are UTC
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return band * 10**10 + int(created_at.timestamp())
+
+
+def content_fingerprint(complaint_doc):
+    """Stable hash of the pipeline-derived fields of a complaint document"""
+    content = {
+        field: value
+        for field, value in complaint_doc.items()
+        if field not in OPERATOR_FIELDS and field not in VOLATILE_FIELDS
+    }
+    encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def parse_created_time(created_time):
+    """Facebook created_time ("2025-07-23T12:31:00+0000") as an aware UTC datetime"""
+    if not created_time:
+        return None
+    try:
+        dt = datetime.fromisoformat(created_time.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = datetime.strptime(created_time, "%Y-%m-%dT%H:%M:%S%z")
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def encode_page_cursor(complaint):
+    """Opaque cursor holding the sort key of the last complaint on a page"""
+    key = {"r": complaint.get("triage_rank"), "i": str(complaint["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_page_cursor(cursor):
+    """Sort key from encode_page_cursor; ValueError for anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        # None: the page ended among complaints not yet given a triage_rank
+        rank = None if key["r"] is None else int(key["r"])
+        return rank, ObjectId(key["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def encode_change_token(change_seq):
+    """Opaque /api/complaints/changes token for the last change_seq seen"""
+    key = {"c": change_seq}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_change_token(token):
+    """change_seq from encode_change_token; ValueError for anything malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        change_seq = int(json.loads(base64.urlsafe_b64decode(padded.encode()))["c"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid token")
+    if change_seq < 0:
+        raise ValueError("Invalid token")
+    return change_seq
+
+
+def _after_cursor(rank, object_id):
+    """Filter for documents strictly after a sort key in PAGE_SORT order.
+
+    Complaints without triage_rank (until migrate_triage_rank has run) sort
+    after every ranked one, so they follow any ranked cursor.
+    """
+    if rank is None:
+        return {"triage_rank": None, "_id": {"$lt": object_id}}
+    return {
+        "$or": [
+            {"triage_rank": {"$lt": rank}},
+            {"triage_rank": rank, "_id": {"$lt": object_id}},
+            {"triage_rank": None},
+        ]
+    }
+
+
+def _page_sort_key(complaint):
+    """PAGE_SORT as a Python key, for merging hot and archive results"""
+    return complaint.get("triage_rank") or 0, complaint["_id"]
 
 
 class MongoDBComplaintService:
+    """Complaint persistence on top of the process-wide shared MongoClient.
+
+    Instantiating the service is cheap: nothing connects until the first
+    collection access, and collection/index setup runs once per process.
+    """
+
     def __init__(self):
-        self.connection_string = os.getenv("MONGODB_URI")
-        self.client = None
-        self.db = None
-        self.complaints_collection = None
-        self.connect()
+        self.connection_string = Config.MONGODB_URI
+        self.last_save_report = None
+
+    @property
+    def client(self):
+        return get_client()
+
+    @property
+    def db(self):
+        return get_database()
+
+    @property
+    def complaints_collection(self):
+        run_once("complaints", self._setup_complaints_collection)
+        return self.db["complaints"]
+
+    @property
+    def archive_collection(self):
+        """Closed complaints moved out of the hot collection by the archiver"""
+        run_once(
+            "complaints_archive",
+            lambda: ComplaintIndexManager(self.db["complaints_archive"]).ensure_indexes(),
+        )
+        return self.db["complaints_archive"]
+
+    @property
+    def stats_rollup(self):
+        return ComplaintStatsRollup(self.db)
+
+    @property
+    def event_log(self):
+        """Complaint change events tailed by /api/stream"""
+        return ComplaintEventLog(self.db)
+
+    def get_generation(self):
+        """Counter bumped on every complaint write; drives cache invalidation"""
+        doc = self.db["meta"].find_one({"_id": "complaints_generation"})
+        return doc["value"] if doc else 0
+
+    def bump_generation(self):
+        """Mark complaint data as changed for every process's response cache"""
+        try:
+            self.db["meta"].update_one(
+                {"_id": "complaints_generation"}, {"$inc": {"value": 1}}, upsert=True
+            )
+        except Exception as e:
+            print(f"⚠️  Could not bump complaints generation: {e}")
+
+    @contextmanager
+    def reserving_change_seq(self, count=1):
+        """First of count new change_seq values, pending until the block exits.
+
+        Wrap the write that stamps them. With concurrent writers a lower
+        number can commit after a higher one; find_changes never reads past
+        a number that is still pending, so no token skips over it.
+        """
+        first = reserve_sequence(self.db, CHANGE_SEQ_COUNTER, count, pending=True)
+        try:
+            yield first
+        finally:
+            try:
+                release_sequence(
+                    self.db,
+                    CHANGE_SEQ_COUNTER,
+                    first,
+                    Config.CHANGE_SEQ_PENDING_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                # Readers stop waiting on it after the pending timeout
+                print(f"⚠️  Could not release change_seq {first}: {e}")
 
     def connect(self):
-        """Connect to MongoDB and setup complaints collection only"""
+        """Eagerly connect and run setup (normally done on first use)"""
+        run_once("complaints", self._setup_complaints_collection)
+        return self
+
+    def _setup_complaints_collection(self):
+        """Verify the connection and setup complaints collection only"""
         try:
-            self.client = MongoClient(self.connection_string)
             self.client.server_info()
             print("✅ Successfully connected to MongoDB!")
 
-            self.db = self.client["complaint_database"]
-
             # Setup only complaints collection
             if "complaints" not in self.db.list_collection_names():
                 self.db.create_collection("complaints")
                 print("📄 Collection 'complaints' created")
 
-            self.complaints_collection = self.db["complaints"]
-
-            # Create unique index to prevent duplicates
-            self.setup_unique_index()
+            # Unique post index plus the dashboard filter/sort indexes
+            self.setup_indexes()
 
         except Exception as e:
             print(f"❌ Failed to connect to MongoDB: {str(e)}")
             raise
 
-    def setup_unique_index(self):
-        """Create unique index on facebook_post_id for complaints"""
+    def setup_indexes(self):
+        """Create the managed index set (unique facebook_post_id + query shapes)"""
         try:
-            self.complaints_collection.create_index(
-                "facebook_post_id", unique=True, background=True
-            )
-            print("✅ Unique index created for complaints collection")
+            ComplaintIndexManager(self.db["complaints"]).ensure_indexes()
+            print("✅ Indexes verified for complaints collection")
         except Exception as e:
             print(f"⚠️  Index creation note: {e}")
 
-    def save_complaints_only(self, processed_posts):
-        """Save ONLY complaints to MongoDB - ignore non-complaints"""
-        complaints_saved = 0
-        complaints_updated = 0
+    def save_complaints_only(self, processed_posts, chunk_size=None):
+        """Save ONLY complaints to MongoDB - ignore non-complaints.
+
+        Each complaint carries a fingerprint of its AI-derived fields. Posts
+        whose fingerprint matches the stored one are not written at all;
+        changed posts get a targeted $set, and operator-owned fields such as
+        status are only set on insert so officers' progress is preserved.
+        Writes go out as unordered bulk writes in chunks. Returns
+        (inserted, modified) like before; the full report including
+        unchanged counts and per-document errors is kept in
+        self.last_save_report.
+        """
+        chunk_size = chunk_size or Config.MONGODB_BULK_CHUNK_SIZE
         non_complaints_skipped = 0
+        errors = []
+        post_ids = []
+        documents = []
 
         for post_data in processed_posts:
-            try:
-                # Only process complaints
-                if post_data["complaint"]["is_complaint"]:
-                    facebook_post_id = post_data.get("post_id")
-                    if not facebook_post_id:
-                        print(f"   ⚠️  Skipping complaint without ID")
-                        continue
-
-                    complaint_doc = self._map_to_complaint_schema(post_data)
-
-                    # UPSERT complaint (prevent duplicates)
-                    result = self.complaints_collection.replace_one(
-                        {"facebook_post_id": facebook_post_id},
-                        complaint_doc,
-                        upsert=True,
-                    )
+            # Only process complaints
+            if not post_data.get("complaint", {}).get("is_complaint"):
+                non_complaints_skipped += 1
+                continue
 
-                    if result.upserted_id:
-                        complaints_saved += 1
-                        print(f"   💾 NEW complaint saved: {facebook_post_id}")
-                    elif result.modified_count > 0:
-                        complaints_updated += 1
-                        print(f"   🔄 Complaint UPDATED: {facebook_post_id}")
-                    else:
-                        print(f"   ✅ Complaint unchanged: {facebook_post_id}")
-                else:
-                    # Skip non-complaints
-                    non_complaints_skipped += 1
+            facebook_post_id = post_data.get("post_id")
+            if not facebook_post_id:
+                print(f"   ⚠️  Skipping complaint without ID")
+                continue
 
+            try:
+                complaint_doc = self._map_to_complaint_schema(post_data)
             except Exception as e:
-                print(
-                    f"   ❌ Error saving complaint {post_data.get('post_id', 'Unknown')}: {e}"
-                )
+                errors.append({"facebook_post_id": facebook_post_id, "error": str(e)})
+                continue
+
+            post_ids.append(facebook_post_id)
+            documents.append(complaint_doc)
+
+        totals = {"inserted": 0, "modified": 0, "unchanged": 0, "archived": 0}
+        for start in range(0, len(documents), chunk_size):
+            self._bulk_write_chunk(
+                post_ids[start : start + chunk_size],
+                documents[start : start + chunk_size],
+                totals,
+                errors,
+            )
+
+        self.last_save_report = {
+            **totals,
+            "non_complaints_skipped": non_complaints_skipped,
+            "errors": errors,
+        }
 
         print(f"\n📊 MONGODB SAVE SUMMARY (Complaints Only):")
-        print(f"   ⚠️  Complaints saved: {complaints_saved}")
-        print(f"   🔄 Complaints updated: {complaints_updated}")
+        print(f"   ⚠️  Complaints saved: {totals['inserted']}")
+        print(f"   🔄 Complaints updated: {totals['modified']}")
+        print(f"   ✅ Complaints unchanged: {totals['unchanged']}")
+        if totals["archived"]:
+            print(f"   🗄️  Already archived: {totals['archived']}")
         print(f"   🚫 Non-complaints skipped: {non_complaints_skipped}")
+        if errors:
+            print(f"   ❌ Complaints failed: {len(errors)}")
+
+        return totals["inserted"], totals["modified"]
+
+    def _change_operation(self, complaint_doc, fingerprint, change_seq):
+        """Targeted upsert: $set pipeline fields, $setOnInsert operator fields"""
+        content = {
+            field: value
+            for field, value in complaint_doc.items()
+            if field not in OPERATOR_FIELDS
+        }
+        content["content_fingerprint"] = fingerprint
+        content["change_seq"] = change_seq
+        initial = {
+            field: complaint_doc.get(field, default)
+            for field, default in OPERATOR_FIELDS.items()
+        }
+        return UpdateOne(
+            {"facebook_post_id": complaint_doc["facebook_post_id"]},
+            {"$set": content, "$setOnInsert": initial},
+            upsert=True,
+        )
+
+    def _bulk_write_chunk(self, post_ids, documents, totals, errors):
+        """Write the changed complaints of one chunk and fold the result into totals"""
+        # Pre-images drive change detection and let the rollup move counters
+        previous = {
+            doc["facebook_post_id"]: doc
+            for doc in self.complaints_collection.find(
+                {"facebook_post_id": {"$in": post_ids}}, PREVIOUS_PROJECTION
+            )
+        }
+
+        # Closed-and-archived complaints must not be resurrected by a re-fetch
+        unseen = [post_id for post_id in post_ids if post_id not in previous]
+        archived = set()
+        if unseen:
+            archived = {
+                doc["facebook_post_id"]
+                for doc in self.archive_collection.find(
+                    {"facebook_post_id": {"$in": unseen}}, {"facebook_post_id": 1}
+                )
+            }
+
+        pending = []
+        changed = []
+        for post_id, document in zip(post_ids, documents):
+            if post_id in archived:
+                totals["archived"] += 1
+                continue
+
+            fingerprint = content_fingerprint(document)
+            before = previous.get(post_id)
+            if before and before.get("content_fingerprint") == fingerprint:
+                totals["unchanged"] += 1
+                continue
+
+            # What the stored document will look like, operator fields kept
+            after = dict(document)
+            for field, default in OPERATOR_FIELDS.items():
+                after[field] = (before or document).get(field, default)
+            pending.append((post_id, before, after))
+            changed.append((document, fingerprint))
+
+        if not changed:
+            return
+
+        failed_indexes = set()
+        with self.reserving_change_seq(len(changed)) as first_seq:
+            operations = [
+                self._change_operation(document, fingerprint, first_seq + offset)
+                for offset, (document, fingerprint) in enumerate(changed)
+            ]
+            try:
+                details = self.complaints_collection.bulk_write(
+                    operations, ordered=False
+                ).bulk_api_result
+            except BulkWriteError as e:
+                # Unordered: every other operation in the chunk was still applied
+                details = e.details
+                for write_error in details.get("writeErrors", []):
+                    failed_indexes.add(write_error["index"])
+                    errors.append(
+                        {
+                            "facebook_post_id": pending[write_error["index"]][0],
+                            "code": write_error.get("code"),
+                            "error": write_error.get("errmsg", ""),
+                        }
+                    )
+            except Exception as e:
+                print(f"   ❌ Bulk write failed for {len(operations)} complaints: {e}")
+                errors.extend(
+                    {"facebook_post_id": post_id, "error": str(e)}
+                    for post_id, _, _ in pending
+                )
+                return
+
+        totals["inserted"] += details.get("nUpserted", 0)
+        totals["modified"] += details.get("nModified", 0)
+        totals["unchanged"] += details.get("nMatched", 0) - details.get("nModified", 0)
+        if details.get("nUpserted", 0) or details.get("nModified", 0):
+            self.bump_generation()
+
+        written = [
+            change for index, change in enumerate(pending) if index not in failed_indexes
+        ]
+        delta = self.stats_rollup.apply_changes(
+            (before, after) for _, before, after in written
+        )
+        self.event_log.publish(
+            [
+                (
+                    "complaint",
+                    post_id,
+                    {"op": "updated" if before else "inserted", "complaint": after},
+                )
+                for post_id, before, after in written
+            ]
+            + ([("stats", None, {"delta": delta})] if delta else [])
+        )
+
+    def update_complaint_status(self, facebook_post_id, status):
+        """Change a complaint's status and move its rollup counters.
+
+        Called by POST /api/complaints/status; returns False when no hot
+        complaint has that id.
+        """
+        if status not in STATUS_DISPLAY:
+            raise ValueError(
+                f"status must be one of {', '.join(sorted(STATUS_DISPLAY))}"
+            )
+        with self.reserving_change_seq() as change_seq:
+            previous = self.complaints_collection.find_one_and_update(
+                {"facebook_post_id": facebook_post_id},
+                {
+                    "$set": {
+                        "status": status,
+                        "status_updated_at": datetime.now(),
+                        "last_updated": datetime.now().isoformat(),
+                        "change_seq": change_seq,
+                    }
+                },
+                projection=ROLLUP_PROJECTION,
+                return_document=ReturnDocument.BEFORE,
+            )
+        if previous is None:
+            return False
+
+        delta = self.stats_rollup.apply_changes(
+            [(previous, {**previous, "status": status})]
+        )
+        self.bump_generation()
+        self.event_log.publish(
+            [
+                (
+                    "status",
+                    facebook_post_id,
+                    {"status": status, "previous_status": previous.get("status")},
+                )
+            ]
+            + ([("stats", None, {"delta": delta})] if delta else [])
+        )
+        return True
+
+    def rebuild_stats_rollup(self):
+        """Recompute the rollup, catching up with writes made meanwhile"""
+        return self.stats_rollup.rebuild(
+            self.complaints_collection,
+            self.archive_collection,
+            watermark=lambda: committed_sequence(
+                self.db, CHANGE_SEQ_COUNTER, Config.CHANGE_SEQ_PENDING_TIMEOUT_SECONDS
+            ),
+        )
 
-        return complaints_saved, complaints_updated
+    def ensure_stats_rollup(self):
+        """Build the rollup if it is missing; run by the scheduler at startup.
+
+        Never called from request handlers: concurrent rebuilds would race
+        on the staging collection swap.
+        """
+        if not self.stats_rollup.is_built():
+            self.rebuild_stats_rollup()
+
+    def get_stats_snapshot(self):
+        """Dashboard counters from the rollup (O(buckets)), $facet as fallback"""
+        try:
+            # Until ensure_stats_rollup has run, aggregate instead
+            if self.stats_rollup.is_built():
+                return self.stats_rollup.read_stats()
+        except Exception as e:
+            print(f"⚠️  Stats rollup unavailable, aggregating directly: {e}")
+        return self.aggregate_complaint_stats(include_archived=True)
+
+    def find_complaints(self, query, view="list", include_archived=False):
+        """Complaints matching query, reading only the fields of a named view"""
+        if view not in COMPLAINT_PROJECTIONS:
+            raise ValueError(
+                f"Unknown view '{view}', expected one of {sorted(COMPLAINT_PROJECTIONS)}"
+            )
+        projection = COMPLAINT_PROJECTIONS[view]
+
+        complaints = list(
+            self.complaints_collection.find(query, projection).sort(PAGE_SORT)
+        )
+        if include_archived:
+            complaints += list(
+                self.archive_collection.find(query, projection).sort(PAGE_SORT)
+            )
+            complaints.sort(key=_page_sort_key, reverse=True)
+        return complaints
+
+    def find_complaints_page(
+        self, query, limit, cursor=None, view="list", include_archived=False
+    ):
+        """One keyset page of complaints: (complaints, next_cursor).
+
+        Pages are ordered by PAGE_SORT and continue strictly after the sort
+        key in the cursor, so every page is an index range scan of at most
+        `limit` entries however deep it is.
+        """
+        limit = max(1, min(limit, Config.COMPLAINTS_MAX_PAGE_SIZE))
+        projection = COMPLAINT_PROJECTIONS[view]
+        if cursor:
+            query = {"$and": [query, _after_cursor(*decode_page_cursor(cursor))]}
+
+        collections = [self.complaints_collection]
+        if include_archived:
+            collections.append(self.archive_collection)
+
+        # Fetch one extra row to know whether another page exists
+        complaints = []
+        for collection in collections:
+            complaints += list(
+                collection.find(query, projection).sort(PAGE_SORT).limit(limit + 1)
+            )
+        if len(collections) > 1:
+            complaints.sort(key=_page_sort_key, reverse=True)
+
+        page = complaints[:limit]
+        next_cursor = encode_page_cursor(page[-1]) if len(complaints) > limit else None
+        return page, next_cursor
+
+    def find_changes(self, since_seq, limit, view="list", include_archived=False):
+        """Complaints written after since_seq, in change order.
+
+        Returns (upserted, removed_post_ids, last_seq, has_more). Archived
+        complaints carry the change_seq of their move, so without
+        include_archived they are reported as removed; a first sync
+        (since_seq 0) has nothing to remove and skips the archive.
+
+        Only numbers up to the committed change_seq are read (read before
+        the queries), so last_seq never passes a write still in flight.
+        """
+        committed_seq = committed_sequence(
+            self.db, CHANGE_SEQ_COUNTER, Config.CHANGE_SEQ_PENDING_TIMEOUT_SECONDS
+        )
+        if committed_seq <= since_seq:
+            return [], [], since_seq, False
+
+        projection = COMPLAINT_PROJECTIONS[view]
+        if projection is not None:
+            projection = {**projection, "change_seq": 1}
+        query = {"change_seq": {"$gt": since_seq, "$lte": committed_seq}}
+
+        changes = [
+            (complaint, False)
+            for complaint in self.complaints_collection.find(query, projection)
+            .sort("change_seq", 1)
+            .limit(limit + 1)
+        ]
+        if include_archived or since_seq:
+            if not include_archived:
+                projection = {"facebook_post_id": 1, "change_seq": 1}
+            changes += [
+                (complaint, not include_archived)
+                for complaint in self.archive_collection.find(query, projection)
+                .sort("change_seq", 1)
+                .limit(limit + 1)
+            ]
+            changes.sort(key=lambda change: change[0]["change_seq"])
+
+        page = changes[:limit]
+        upserted = [complaint for complaint, is_removal in page if not is_removal]
+        removed = [
+            complaint["facebook_post_id"] for complaint, is_removal in page if is_removal
+        ]
+        last_seq = page[-1][0]["change_seq"] if page else since_seq
+        return upserted, removed, last_seq, len(changes) > limit
 
     def get_complaints_count(self):
         """Get total complaints in database"""
         return self.complaints_collection.count_documents({})
 
+    def aggregate_complaint_stats(self, trend_days=7, include_archived=False):
+        """All dashboard distributions in one server-side $facet round trip"""
+        trend_start = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) - timedelta(days=trend_days - 1)
+
+        # The scan still reads whole documents; this only trims what the
+        # $facet branches (and any $unionWith) carry to the counters
+        projection = {
+            "$project": {
+                "_id": 0,
+                "status": 1,
+                "priority_score": 1,
+                "department": 1,
+                "ai_analysis.urgency_level": 1,
+                "location_data.location": 1,
+                "created_at": 1,
+            }
+        }
+        pipeline = [projection]
+        if include_archived:
+            pipeline.append(
+                {"$unionWith": {"coll": "complaints_archive", "pipeline": [projection]}}
+            )
+        pipeline += [
+            {
+                "$facet": {
+                    "total": [{"$count": "count"}],
+                    "status": [
+                        {
+                            "$group": {
+                                "_id": {"$ifNull": ["$status", "pending_review"]},
+                                "count": {"$sum": 1},
+                            }
+                        }
+                    ],
+                    "priority": [
+                        {
+                            "$group": {
+                                "_id": {"$ifNull": ["$priority_score", 1]},
+                                "count": {"$sum": 1},
+                            }
+                        }
+                    ],
+                    "department": [
+                        {"$group": {"_id": "$department", "count": {"$sum": 1}}}
+                    ],
+                    "urgency": [
+                        {
+                            "$group": {
+                                "_id": {
+                                    "$ifNull": ["$ai_analysis.urgency_level", "low"]
+                                },
+                                "count": {"$sum": 1},
+                            }
+                        }
+                    ],
+                    "location_detected": [
+                        {"$match": {"location_data.location": {"$nin": ["", "area", None]}}},
+                        {"$count": "count"},
+                    ],
+                    "daily_trend": [
+                        {"$match": {"created_at": {"$gte": trend_start}}},
+                        {
+                            "$group": {
+                                "_id": {
+                                    "$dateToString": {
+                                        "format": "%Y-%m-%d",
+                                        "date": "$created_at",
+                                    }
+                                },
+                                "count": {"$sum": 1},
+                            }
+                        },
+                    ],
+                }
+            },
+        ]
+
+        facets = next(self.complaints_collection.aggregate(pipeline), {})
+
+        def counts(name):
+            return {doc["_id"]: doc["count"] for doc in facets.get(name, [])}
+
+        def single(name):
+            rows = facets.get(name, [])
+            return rows[0]["count"] if rows else 0
+
+        return {
+            "total": single("total"),
+            "status_counts": counts("status"),
+            "priority_counts": counts("priority"),
+            "department_counts": counts("department"),
+            "urgency_counts": counts("urgency"),
+            "location_detected": single("location_detected"),
+            "daily_counts": counts("daily_trend"),
+        }
+
     def get_comprehensive_stats(self):
         """Get comprehensive statistics for dashboard - FIXED METHOD"""
         try:
-            # Get all complaints
-            all_complaints = list(self.complaints_collection.find())
-            total_count = len(all_complaints)
+            stats = self.get_stats_snapshot()
+            total_count = stats["total"]
 
             if total_count == 0:
                 return {
@@ -114,26 +759,19 @@ class MongoDBComplaintService:
                     "department_distribution": [],
                 }
 
-            # Priority distribution
-            priority_dist = {}
-            for complaint in all_complaints:
-                priority = complaint.get("priority_score", 1)
-                priority_dist[priority] = priority_dist.get(priority, 0) + 1
-
             priority_distribution = [
-                {"_id": k, "count": v} for k, v in sorted(priority_dist.items())
+                {"_id": k, "count": v}
+                for k, v in sorted(stats["priority_counts"].items())
             ]
 
-            # Department distribution
-            dept_dist = {}
-            for complaint in all_complaints:
-                dept = complaint.get("department", "Unknown")
-                if dept != "Unknown":
-                    dept_dist[dept] = dept_dist.get(dept, 0) + 1
-
             department_distribution = [
                 {"_id": k, "count": v}
-                for k, v in sorted(dept_dist.items(), key=lambda x: x[1], reverse=True)
+                for k, v in sorted(
+                    stats["department_counts"].items(),
+                    key=lambda x: x[1],
+                    reverse=True,
+                )
+                if k and k != "Unknown"
             ]
 
             return {
@@ -154,13 +792,13 @@ class MongoDBComplaintService:
         """Get recent complaints"""
         try:
             # Calculate date threshold
-            threshold_date = (datetime.now() - timedelta(days=days)).strftime(
-                "%Y-%m-%d"
-            )
+            threshold = datetime.now(timezone.utc) - timedelta(days=days)
 
             # Query recent complaints
             recent_complaints = list(
-                self.complaints_collection.find({"date": {"$gte": threshold_date}})
+                self.complaints_collection.find(
+                    {"created_at": {"$gte": threshold}}, COMPLAINT_PROJECTIONS["list"]
+                )
                 .sort("priority_score", -1)
                 .limit(10)
             )
@@ -174,21 +812,10 @@ class MongoDBComplaintService:
     def _map_to_complaint_schema(self, post_data):
         """Map complaint data to MongoDB schema"""
 
-        # Parse Facebook creation time
-        fb_created_time = post_data.get("created_time", "")
-        if fb_created_time:
-            try:
-                dt = datetime.fromisoformat(fb_created_time.replace("Z", "+00:00"))
-                time_str = dt.strftime("%H:%M:%S")
-                date_str = dt.strftime("%Y-%m-%d")
-            except:
-                now = datetime.now()
-                time_str = now.strftime("%H:%M:%S")
-                date_str = now.strftime("%Y-%m-%d")
-        else:
-            now = datetime.now()
-            time_str = now.strftime("%H:%M:%S")
-            date_str = now.strftime("%Y-%m-%d")
+        # Parse Facebook creation time into a native BSON datetime
+        created_at = parse_created_time(post_data.get("created_time", ""))
+        if created_at is None:
+            created_at = datetime.now(timezone.utc)
 
         # Extract media links
         media = post_data.get("media", {})
@@ -201,8 +828,7 @@ class MongoDBComplaintService:
 
         # Enhanced complaint schema
         complaint_doc = {
-            "time": time_str,
-            "date": date_str,
+            "created_at": created_at,
             "profile_name": post_data.get("username", "Unknown"),
             "image_link": image_link,
             "video_link": video_link,
@@ -233,4 +859,18 @@ class MongoDBComplaintService:
             "last_updated": datetime.now().isoformat(),
         }
 
+        complaint_doc["triage_rank"] = triage_rank(
+            complaint_doc["priority_score"],
+            complaint_doc["ai_analysis"]["urgency_level"],
+            created_at,
+        )
+
+        # Legacy string fields, only during the created_at compatibility window
+        if Config.WRITE_LEGACY_DATE_FIELDS:
+            complaint_doc["time"] = created_at.strftime("%H:%M:%S")
+            complaint_doc["date"] = created_at.strftime("%Y-%m-%d")
+
+        # Formatted dashboard values, so reads do no per-row date formatting
+        complaint_doc["display"] = compute_display(complaint_doc)
+
         return complaint_doc
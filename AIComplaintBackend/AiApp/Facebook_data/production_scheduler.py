@@ -7,6 +7,10 @@ import logging
 
 # Import your main function
 from main import main
+from config import Config
+from complaint_archiver import ComplaintArchiver
+from complaint_migrations import run_migrations
+from mongodb_data_service import MongoDBComplaintService
 
 class ProductionScheduler:
     def __init__(self):
@@ -51,7 +55,7 @@ class ProductionScheduler:
         
         try:
             # Execute your main function
-            main()
+            main(job_name="scheduler")
             
             # Success tracking
             duration = time.time() - start_time
@@ -60,6 +64,10 @@ class ProductionScheduler:
             
             print(f"✅ Success! Duration: {duration:.1f}s")
             
+            # Move old closed complaints out of the hot collection
+            if self.run_count % Config.ARCHIVE_EVERY_RUNS == 0:
+                self.run_archival()
+
             # Log health every 5 runs
             if self.run_count % 5 == 0:
                 health = self.health_check()
@@ -79,6 +87,29 @@ class ProductionScheduler:
                 if failure_rate > 20:
                     print(f"⚠️  WARNING: High failure rate ({failure_rate:.1f}%)")
     
+    def run_migrations(self):
+        """Backfill fields older complaints lack (created_at, triage_rank,
+        change_seq, display); documents without change_seq are invisible to
+        /api/complaints/changes until this runs"""
+        try:
+            run_migrations(MongoDBComplaintService())
+        except Exception as e:
+            print(f"⚠️  Complaint migrations skipped: {e}")
+
+    def ensure_stats_rollup(self):
+        """Build the complaint_stats rollup once if it is missing"""
+        try:
+            MongoDBComplaintService().ensure_stats_rollup()
+        except Exception as e:
+            print(f"⚠️  Stats rollup not built (dashboard aggregates directly): {e}")
+
+    def run_archival(self):
+        """Archive closed complaints; failures never fail the main job"""
+        try:
+            ComplaintArchiver(MongoDBComplaintService()).archive()
+        except Exception as e:
+            print(f"⚠️  Archival skipped: {e}")
+
     def start(self):
         """Start production scheduler"""
         env_name = "PRODUCTION" if self.is_production else "DEVELOPMENT"
@@ -91,6 +122,10 @@ class ProductionScheduler:
         print(f"🗄️  Saving to MongoDB + JSON files")
         print("=" * 60)
         
+        self.run_migrations()
+        # The dashboard reads stats from the rollup; only this process builds it
+        self.ensure_stats_rollup()
+
         # Initial run
         self.run_main_job()
         
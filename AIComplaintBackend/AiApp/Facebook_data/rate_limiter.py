@@ -1,35 +1,57 @@
 import time
-from datetime import datetime, timedelta
+import threading
 from config import Config
 
 
 class RateLimiter:
-    def __init__(self):
-        self.max_requests = Config.MAX_REQUESTS_PER_HOUR
+    """Hourly request budget plus a per-API delay between requests.
+
+    The budget is counted per process: the backfill command's limiter does
+    not see requests made by the live scheduler, so the two budgets must
+    together stay within the API quota.
+    """
+
+    def __init__(self, max_requests=None, facebook_delay=None, groq_delay=None):
+        self.max_requests = max_requests or Config.MAX_REQUESTS_PER_HOUR
+        # Start times (time.monotonic()) of requests in the last hour,
+        # including slots reserved by threads that are still waiting
         self.requests = []
-        self.facebook_delay = Config.FACEBOOK_DELAY
-        self.groq_delay = Config.GROQ_DELAY
+        self.facebook_delay = (
+            facebook_delay if facebook_delay is not None else Config.FACEBOOK_DELAY
+        )
+        self.groq_delay = groq_delay if groq_delay is not None else Config.GROQ_DELAY
+        self._last_start = 0.0
+        # Shared by worker threads (e.g. parallel backfill chunks); only held
+        # while reserving a slot, never while sleeping
+        self._lock = threading.Lock()
 
     def wait_if_needed(self, api_type="facebook"):
-        now = datetime.now()
-
-        # Remove requests older than 1 hour
-        self.requests = [
-            req_time
-            for req_time in self.requests
-            if now - req_time < timedelta(hours=1)
-        ]
-
-        # Check if we're at the limit
-        if len(self.requests) >= self.max_requests:
-            sleep_time = 3600
-            print(f"⚠️  Rate limit reached. Waiting {sleep_time/60:.1f} minutes...")
-            time.sleep(sleep_time)
-
-        # API-specific delays
         if api_type == "facebook":
-            time.sleep(self.facebook_delay)
+            delay = self.facebook_delay
         elif api_type == "groq":
-            time.sleep(self.groq_delay)
+            delay = self.groq_delay
+        else:
+            delay = 0
+
+        with self._lock:
+            now = time.monotonic()
+
+            # Remove requests older than 1 hour
+            self.requests = [
+                start for start in self.requests if now - start < 3600
+            ]
+
+            # API-specific delays, spaced after the last reserved request
+            start = max(now, self._last_start) + delay
+
+            # Check if we're at the limit: wait for the oldest slot to expire
+            if len(self.requests) >= self.max_requests:
+                start = max(start, self.requests[-self.max_requests] + 3600)
+                print(
+                    f"⚠️  Rate limit reached. Waiting {(start - now)/60:.1f} minutes..."
+                )
+
+            self._last_start = start
+            self.requests.append(start)
 
-        self.requests.append(now)
+        time.sleep(max(0.0, start - now))
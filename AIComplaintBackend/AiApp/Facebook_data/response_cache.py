@@ -0,0 +1,187 @@
+# response_cache.py - Generation-invalidated, byte-bounded response cache
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Entry:
+    __slots__ = ("generation", "value", "size", "stored_at")
+
+    def __init__(self, generation, value, size):
+        self.generation = generation
+        self.value = value
+        self.size = size
+        self.stored_at = time.monotonic()
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """LRU cache of serialized responses, invalidated by a data generation.
+
+    generation_fn returns a number that changes whenever the underlying
+    data changes (MongoDBComplaintService bumps it on every write); it is
+    polled at most once per generation_ttl seconds. Entries from an older
+    generation are served stale for up to max_stale seconds while a single
+    background refresh recomputes them. Concurrent misses for one key share
+    one computation.
+    """
+
+    def __init__(self, max_bytes, generation_fn, generation_ttl=2.0, max_stale=300):
+        self.max_bytes = max_bytes
+        self.generation_fn = generation_fn
+        self.generation_ttl = generation_ttl
+        self.max_stale = max_stale
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._bytes = 0
+        self._generation = None
+        self._generation_checked = 0.0
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "refresh_errors": 0,
+        }
+
+    def current_generation(self):
+        now = time.monotonic()
+        expired = now - self._generation_checked >= self.generation_ttl
+        if self._generation is None or expired:
+            try:
+                self._generation = self.generation_fn()
+            except Exception as e:
+                print(f"⚠️  Cache generation unavailable: {e}")
+                if self._generation is None:
+                    raise
+            self._generation_checked = now
+        return self._generation
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key.
+
+        compute(generation) must return (value, size_in_bytes); it receives
+        the generation read before computing so callers can tag the value.
+        """
+        generation = self.current_generation()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.generation == generation:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry.value
+
+            age = time.monotonic() - entry.stored_at if entry is not None else None
+            if entry is not None and age <= self.max_stale:
+                # Stale: answer now, refresh once in the background
+                self._counters["stale_hits"] += 1
+                if key not in self._flights:
+                    self._flights[key] = _Flight()
+                    threading.Thread(
+                        target=self._run_flight,
+                        args=(key, compute, generation),
+                        daemon=True,
+                    ).start()
+                return entry.value
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self._counters["misses"] += 1
+                leader = True
+
+        if leader:
+            self._run_flight(key, compute, generation)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def peek(self, key):
+        """Stored value for key whatever its generation, or None; never computes.
+
+        For values whose key already pins the data they derive from (e.g.
+        compressed variants keyed by the body's generation).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry.value
+
+    def put(self, key, value, size):
+        """Store a value produced outside get_or_compute (see peek)"""
+        self._store(key, self._generation, value, size)
+
+    def _run_flight(self, key, compute, generation):
+        flight = self._flights[key]
+        try:
+            value, size = compute(generation)
+            flight.value = value
+            self._store(key, generation, value, size)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._counters["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key, generation, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = _Entry(generation, value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+            used = self._bytes
+        served_from_cache = counters["hits"] + counters["stale_hits"]
+        lookups = served_from_cache + counters["misses"] + counters["coalesced"]
+        return {
+            **counters,
+            "hit_rate": round(served_from_cache / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": used,
+            "max_bytes": self.max_bytes,
+            "generation": self._generation,
+        }
@@ -0,0 +1,68 @@
+# response_compression.py - Accept-Encoding negotiation and body compression
+import gzip
+import zlib
+from config import Config
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Server preference when the client accepts several encodings equally
+SUPPORTED_ENCODINGS = (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding):
+    """Best supported content-coding for an Accept-Encoding header, or None"""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if coding:
+            weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body, encoding):
+    """Whole-body compression for responses with a known Content-Length"""
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=Config.GZIP_LEVEL, mtime=0)
+    return body
+
+
+def iter_compressed(body, encoding, chunk_size=64 * 1024):
+    """Compress a large body incrementally, yielding output as it is produced"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=Config.BROTLI_QUALITY)
+        for start in range(0, len(body), chunk_size):
+            output = compressor.process(body[start : start + chunk_size])
+            if output:
+                yield output
+        yield compressor.finish()
+        return
+
+    # wbits=31 writes the gzip container around the deflate stream
+    compressor = zlib.compressobj(Config.GZIP_LEVEL, zlib.DEFLATED, 31)
+    for start in range(0, len(body), chunk_size):
+        output = compressor.compress(body[start : start + chunk_size])
+        if output:
+            yield output
+    yield compressor.flush()
@@ -0,0 +1,171 @@
+# run_checkpoint.py - Per-post journal so a crashed run can resume
+import json
+import os
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+from datetime import datetime, timedelta
+from config import Config
+
+
+class RunCheckpoint:
+    """Append-only JSON-lines journal of post progress within one run.
+
+    Each line records a post id, the stage it reached ("classified",
+    "analyzed" or "processed") and the partial result for that stage.
+    A journal without a "run_complete" line belongs to a crashed run and
+    is replayed by the next run instead of redoing the Groq work.
+
+    Journals are keyed by job name (the scheduler and a manual main.py run
+    keep separate files) and guarded by an exclusive lock, so a second
+    process on the same job runs without a journal rather than truncating
+    or resuming the first one's.
+    """
+
+    STAGES = ("classified", "analyzed", "processed")
+
+    def __init__(self, job_name="main", journal_dir=None, max_age_hours=None):
+        self.job_name = job_name
+        self.journal_dir = journal_dir or Config.CHECKPOINT_DIR
+        self.max_age_hours = (
+            max_age_hours if max_age_hours is not None else Config.CHECKPOINT_MAX_AGE_HOURS
+        )
+        self.journal_path = os.path.join(
+            self.journal_dir, f"run_journal_{job_name}.jsonl"
+        )
+        self.lock_path = self.journal_path + ".lock"
+        self.run_id = None
+        self.entries = {}
+        self.resumed = False
+        self._file = None
+        self._lock_file = None
+
+    def start(self):
+        """Open the journal, replaying an unfinished run if one exists"""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.close()
+        self.entries = {}
+        self.resumed = False
+
+        if not self._acquire_lock():
+            print(
+                f"⚠️  Checkpoint journal '{self.job_name}' is in use by another "
+                f"process - running without crash-resume"
+            )
+            return self
+
+        if os.path.exists(self.journal_path):
+            self._replay()
+
+        if not self.resumed:
+            self.run_id = uuid.uuid4().hex
+            self._file = open(self.journal_path, "w", encoding="utf-8")
+            self._write({"event": "run_started", "run_id": self.run_id})
+        else:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+            self._write({"event": "run_resumed", "run_id": self.run_id})
+            print(
+                f"♻️  Resuming run {self.run_id[:8]} - {len(self.entries)} posts checkpointed"
+            )
+
+        return self
+
+    def _acquire_lock(self):
+        """Take the per-job lock; False when another process holds it"""
+        self._lock_file = open(self.lock_path, "a", encoding="utf-8")
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        return True
+
+    def close(self):
+        """Close the journal and release the lock (the journal is kept)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            # Closing the descriptor releases the flock
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _replay(self):
+        """Load progress from an unfinished journal"""
+        run_id = None
+        started_at = None
+        entries = {}
+
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn last line from a crash mid-write
+                        continue
+
+                    event = record.get("event")
+                    if event == "run_started":
+                        run_id = record.get("run_id")
+                        started_at = record.get("at")
+                    elif event == "run_complete":
+                        return
+                    elif event == "post":
+                        stages = entries.setdefault(record["post_id"], {})
+                        stages[record["stage"]] = record.get("result")
+        except Exception as e:
+            print(f"⚠️  Checkpoint journal unreadable, starting fresh: {e}")
+            return
+
+        if not run_id:
+            return
+
+        if started_at:
+            age = datetime.now() - datetime.fromisoformat(started_at)
+            if age > timedelta(hours=self.max_age_hours):
+                print(f"⚠️  Discarding stale checkpoint from {started_at}")
+                return
+
+        self.run_id = run_id
+        self.entries = entries
+        self.resumed = True
+
+    def _write(self, record):
+        record["at"] = datetime.now().isoformat()
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def get(self, post_id, stage):
+        """Return the checkpointed result for a post stage, or None"""
+        return self.entries.get(post_id, {}).get(stage)
+
+    def has(self, post_id, stage):
+        return stage in self.entries.get(post_id, {})
+
+    def record(self, post_id, stage, result):
+        """Persist the result of a stage for a post"""
+        if not post_id or self._file is None:
+            return
+        self.entries.setdefault(post_id, {})[stage] = result
+        try:
+            self._write(
+                {"event": "post", "post_id": post_id, "stage": stage, "result": result}
+            )
+        except Exception as e:
+            print(f"⚠️  Checkpoint write failed for {post_id}: {e}")
+
+    def complete(self):
+        """Mark the run finished so the next run starts from scratch"""
+        if self._file is None:
+            return
+        self._write({"event": "run_complete", "run_id": self.run_id})
+        os.remove(self.journal_path)
+        self.close()
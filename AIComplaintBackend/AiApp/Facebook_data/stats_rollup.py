@@ -0,0 +1,253 @@
+# stats_rollup.py - Incrementally maintained per-day/per-department counters
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+
+# Fields a complaint contributes to its bucket; used as a find() projection
+ROLLUP_PROJECTION = {
+    "_id": 0,
+    "facebook_post_id": 1,
+    "created_at": 1,
+    "date": 1,
+    "department": 1,
+    "status": 1,
+    "priority_score": 1,
+    "ai_analysis.urgency_level": 1,
+    "location_data.location": 1,
+}
+
+# Bounded so a steady stream of writes cannot keep rebuild() from finishing
+ROLLUP_CATCH_UP_PASSES = 5
+
+
+def _safe_key(value):
+    """Counter names become field paths, so strip '.' and leading '$'"""
+    return str(value).replace(".", "_").lstrip("$") or "unknown"
+
+
+def _nest(fields):
+    """{"status.open": 2, "total": 3} -> {"status": {"open": 2}, "total": 3}"""
+    nested = {}
+    for field, value in fields.items():
+        if "." in field:
+            group, key = field.split(".", 1)
+            nested.setdefault(group, {})[key] = value
+        else:
+            nested[field] = value
+    return nested
+
+
+class ComplaintStatsRollup:
+    def __init__(self, db, collection_name="complaint_stats"):
+        self.db = db
+        self.collection_name = collection_name
+        self.collection = db[collection_name]
+        # meta document written by rebuild(); marks the buckets as complete
+        self._built_marker = f"{collection_name}_built"
+
+    @staticmethod
+    def bucket_of(complaint):
+        """(date, department) bucket a complaint document belongs to"""
+        created_at = complaint.get("created_at")
+        date = created_at.strftime("%Y-%m-%d") if created_at else complaint.get("date")
+        return (
+            date or "unknown",
+            complaint.get("department") or "Unknown",
+        )
+
+    @staticmethod
+    def counters_of(complaint):
+        """Counter increments contributed by one complaint document"""
+        location = (complaint.get("location_data") or {}).get("location")
+        urgency = (complaint.get("ai_analysis") or {}).get("urgency_level") or "low"
+        return {
+            "total": 1,
+            f"status.{_safe_key(complaint.get('status') or 'pending_review')}": 1,
+            f"priority.{_safe_key(complaint.get('priority_score', 1))}": 1,
+            f"urgency.{_safe_key(urgency)}": 1,
+            "location_detected": 1 if location not in ["", "area", None] else 0,
+        }
+
+    def _bucket_id(self, bucket):
+        return f"{bucket[0]}|{bucket[1]}"
+
+    def apply_changes(self, changes):
+        """Apply (old_doc, new_doc) pairs; old_doc None = insert, new_doc None = delete.
+
+        Returns the net change to the dashboard counters (nested like a
+        bucket document, plus per-department and per-day totals).
+        """
+        increments = defaultdict(lambda: defaultdict(int))
+
+        for old_doc, new_doc in changes:
+            if old_doc:
+                bucket = self.bucket_of(old_doc)
+                for field, value in self.counters_of(old_doc).items():
+                    increments[bucket][field] -= value
+            if new_doc:
+                bucket = self.bucket_of(new_doc)
+                for field, value in self.counters_of(new_doc).items():
+                    increments[bucket][field] += value
+
+        operations = []
+        delta = defaultdict(int)
+        for bucket, fields in increments.items():
+            fields = {field: value for field, value in fields.items() if value}
+            if not fields:
+                continue
+            for field, value in fields.items():
+                delta[field] += value
+            if fields.get("total"):
+                delta[f"department.{bucket[1]}"] += fields["total"]
+                delta[f"daily.{bucket[0]}"] += fields["total"]
+            operations.append(
+                UpdateOne(
+                    {"_id": self._bucket_id(bucket)},
+                    {
+                        "$inc": fields,
+                        "$setOnInsert": {"date": bucket[0], "department": bucket[1]},
+                    },
+                    upsert=True,
+                )
+            )
+
+        if operations:
+            try:
+                self.collection.bulk_write(operations, ordered=False)
+            except Exception as e:
+                print(f"⚠️  Stats rollup update failed (run rebuild to repair): {e}")
+        return _nest({field: value for field, value in delta.items() if value})
+
+    def is_built(self):
+        """True once rebuild() has run; before that the buckets only hold
+        the writes made since, so readers must not trust them"""
+        return self.db["meta"].find_one({"_id": self._built_marker}) is not None
+
+    def rebuild(self, *collections, watermark=None):
+        """Recompute every bucket from the complaints (and archive) collections.
+
+        Writers keep $inc-ing the live rollup during the scan, and the swap
+        below discards those increments. With ``watermark`` (a callable
+        returning the committed change_seq) the rebuild catches up instead:
+        documents written after the scan started are re-read by change_seq
+        and their counted version is replaced before the swap. Only the few
+        milliseconds between the last catch-up pass and the rename stay
+        unprotected; without a watermark run it while writers are paused.
+        """
+        # facebook_post_id -> document as counted; a complaint caught in
+        # both collections mid-archive counts once, as its newest copy
+        counted = {}
+        buckets = defaultdict(lambda: defaultdict(int))
+
+        def count(complaint):
+            post_id = complaint.get("facebook_post_id")
+            previous = counted.get(post_id) if post_id else None
+            if previous is not None:
+                if previous.get("change_seq", 0) >= complaint.get("change_seq", 0):
+                    return False
+                for field, value in self.counters_of(previous).items():
+                    buckets[self.bucket_of(previous)][field] -= value
+            counted[post_id] = complaint
+            for field, value in self.counters_of(complaint).items():
+                buckets[self.bucket_of(complaint)][field] += value
+            return True
+
+        projection = {**ROLLUP_PROJECTION, "change_seq": 1}
+        since_seq = watermark() if watermark else None
+        for collection in collections:
+            for complaint in collection.find({}, projection):
+                count(complaint)
+
+        # Catch up with writes made during the scan (and during catch-up)
+        passes = 0
+        while watermark and passes < ROLLUP_CATCH_UP_PASSES:
+            passes += 1
+            next_seq = watermark()
+            changed = False
+            for collection in collections:
+                for complaint in collection.find(
+                    {"change_seq": {"$gt": since_seq}}, projection
+                ):
+                    changed = count(complaint) or changed
+            since_seq = next_seq
+            if not changed:
+                break
+        else:
+            if watermark:
+                print("⚠️  Stats rollup still changing after catch-up; swapping anyway")
+
+        documents = []
+        for bucket, fields in buckets.items():
+            fields = {field: value for field, value in fields.items() if value}
+            if not fields.get("total"):
+                continue
+            documents.append(
+                {
+                    "_id": self._bucket_id(bucket),
+                    "date": bucket[0],
+                    "department": bucket[1],
+                    **_nest(fields),
+                }
+            )
+
+        # Build aside and swap in, so readers never see a half-built rollup
+        staging = self.db[f"{self.collection_name}_rebuild"]
+        staging.drop()
+        if documents:
+            staging.insert_many(documents)
+            staging.rename(self.collection_name, dropTarget=True)
+        else:
+            self.collection.delete_many({})
+        self.db["meta"].update_one(
+            {"_id": self._built_marker},
+            {"$set": {"built_at": datetime.now(timezone.utc), "buckets": len(documents)}},
+            upsert=True,
+        )
+
+        print(f"✅ Stats rollup rebuilt: {len(documents)} buckets")
+        return len(documents)
+
+    def read_stats(self, trend_days=7):
+        """Aggregate the buckets into the shape of aggregate_complaint_stats"""
+        threshold_date = (
+            datetime.now(timezone.utc) - timedelta(days=trend_days - 1)
+        ).strftime("%Y-%m-%d")
+        stats = {
+            "total": 0,
+            "status_counts": defaultdict(int),
+            "priority_counts": defaultdict(int),
+            "department_counts": defaultdict(int),
+            "urgency_counts": defaultdict(int),
+            "location_detected": 0,
+            "daily_counts": defaultdict(int),
+        }
+
+        for bucket in self.collection.find({}):
+            total = bucket.get("total", 0)
+            if total <= 0:
+                continue
+            stats["total"] += total
+            stats["location_detected"] += bucket.get("location_detected", 0)
+            stats["department_counts"][bucket["department"]] += total
+            if bucket["date"] >= threshold_date:
+                stats["daily_counts"][bucket["date"]] += total
+            for status, count in bucket.get("status", {}).items():
+                stats["status_counts"][status] += count
+            for priority, count in bucket.get("priority", {}).items():
+                key = int(priority) if priority.isdigit() else priority
+                stats["priority_counts"][key] += count
+            for urgency, count in bucket.get("urgency", {}).items():
+                stats["urgency_counts"][urgency] += count
+
+        return {
+            key: dict(value) if isinstance(value, defaultdict) else value
+            for key, value in stats.items()
+        }
+
+
+if __name__ == "__main__":
+    from mongodb_data_service import MongoDBComplaintService
+
+    print("🔧 Rebuilding complaint_stats rollup...")
+    service = MongoDBComplaintService()
+    service.rebuild_stats_rollup()
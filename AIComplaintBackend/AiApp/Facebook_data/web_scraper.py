@@ -1,6 +1,8 @@
 import requests
 import re
 from bs4 import BeautifulSoup
+from config import Config
+from deadline import deadline_timeout
 
 
 class WebScraper:
@@ -9,10 +11,14 @@ class WebScraper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
 
-    def get_user_name(self, url):
+    def get_user_name(self, url, deadline=None):
         """Your exact get_user_name function"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = requests.get(
+                url,
+                headers=self.headers,
+                timeout=deadline_timeout(deadline, Config.SCRAPER_TIMEOUT),
+            )
             soup = BeautifulSoup(response.content, "html.parser")
             title = soup.find("title").get_text().strip()
             print(f"Title : {title}")
@@ -42,10 +48,14 @@ class WebScraper:
         except:
             return "Error extracting name"
 
-    def get_media_from_permalink(self, permalink_url):
+    def get_media_from_permalink(self, permalink_url, deadline=None):
         """Get additional media by scraping the permalink"""
         try:
-            response = requests.get(permalink_url, headers=self.headers, timeout=10)
+            response = requests.get(
+                permalink_url,
+                headers=self.headers,
+                timeout=deadline_timeout(deadline, Config.SCRAPER_TIMEOUT),
+            )
             soup = BeautifulSoup(response.content, "html.parser")
             scraped_media = {"images": [], "videos": []}
 
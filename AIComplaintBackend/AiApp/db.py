@@ -1,17 +1,10 @@
-import os
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-load_dotenv()
-connection_string = os.getenv("MONGODB_URI")
-
 try:
-    client = MongoClient(connection_string)
-    client.server_info()
-    print("Successfully connected to MongoDB!")
+    from AiApp.Facebook_data.mongo_client import get_database, run_once
+except ImportError:  # run as a script from the AiApp directory
+    from Facebook_data.mongo_client import get_database, run_once
 
-    db = client['complaint_database']
-    
+
+def _setup_complaints_validator():
     # Create collection without validation first
     if 'complaints' not in db.list_collection_names():
         db.create_collection("complaints")
@@ -21,9 +14,10 @@ try:
     validator = {
         '$jsonSchema': {
             'bsonType': 'object',
-            'required': ['time', 'date', 'profile_name', 'complaint_query', 'department', 'priority_score'],
+            'required': ['profile_name', 'complaint_query', 'department', 'priority_score'],
             'properties': {
                 '_id': {'bsonType': 'objectId'},
+                'created_at': {'bsonType': 'date'},
                 'time': {'bsonType': 'string'},
                 'date': {'bsonType': 'string'},
                 'profile_name': {'bsonType': 'string'},
@@ -53,9 +47,16 @@ try:
 
     db.command('collMod', 'complaints', validator=validator)
     print("Collection validator updated successfully")
-    
+
+
+try:
+    # Shared process-wide client; connects lazily on first use
+    db = get_database('complaint_database')
+
+    run_once('complaints_validator', _setup_complaints_validator)
+
     complaints_collection = db['complaints']
 
 except Exception as e:
     print(f"Failed to connect to MongoDB: {str(e)}")
-    raise
\ No newline at end of file
+    raise